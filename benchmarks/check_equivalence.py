@@ -0,0 +1,87 @@
+"""
+Golden-output check: runs the original parser functions and parse_scan_log side by side
+and diffs their structured results (ECU counts, mode faults, warning, keyword hits,
+ignition cycle counter and the pending/confirmed status).
+
+    python -m benchmarks.check_equivalence <log folders or files> --synthetic 2000
+    python -m benchmarks.check_equivalence <logs> --save-golden golden.json   # record the original outputs
+    python -m benchmarks.check_equivalence <logs> --golden golden.json        # compare with recorded outputs
+
+Exits with 1 if any log diverges.
+"""
+import argparse
+import json
+import random
+import sys
+
+from pathlib import Path
+from constants import KEYWORD_LIST_FILE
+from modules.ecu_processing import parse_scan_log
+from modules.equivalence import diff_outputs, new_outputs, parse_and_compare
+from modules.reference_registry import load_rules_snapshot
+from benchmarks.log_generator import MODE_TITLES, load_variants, generate_log
+
+def real_logs(paths):
+    """Yields (name, content) for the given log files and the *.txt files in the given folders."""
+    for path in map(Path, paths):
+        files = sorted(path.glob('*.txt')) if path.is_dir() else [path]
+        for file_path in files:
+            yield str(file_path), file_path.read_text(encoding='utf-8', errors='replace')
+
+def synthetic_logs(count, json_file_path, seed=0):
+    """Yields (name, content) for count generated logs with varied modes, DTC density and no-response rates."""
+    rng = random.Random(seed)
+    variants = list(load_variants(json_file_path).values())
+    # An unknown mode and skipped modes exercise the ECU count warning
+    modes = list(MODE_TITLES) + ["5"]
+    for index in range(count):
+        log_modes = rng.sample(modes, rng.randint(1, len(modes)))
+        content = generate_log(rng, rng.choice(variants), modes=log_modes,
+                               dtc_density=rng.choice([0.0, 0.2, 1.0]),
+                               no_response_rate=rng.choice([0.0, 0.05, 0.3]))
+        status = rng.choice(["Confirmed", "Pending"])
+        yield f"SYNTH{index:06d}_20240101_{status}.txt", content
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the original and the optimised parsers on a corpus of logs.")
+    parser.add_argument("paths", nargs="*", help="log files or folders of real logs")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated logs to add to the corpus")
+    parser.add_argument("--rules", default=KEYWORD_LIST_FILE)
+    parser.add_argument("--save-golden", help="write the original outputs to this JSON file (not with --golden)")
+    parser.add_argument("--golden", help="compare the optimised outputs with this JSON file instead of re-running the originals")
+    args = parser.parse_args(argv)
+
+    rules = load_rules_snapshot(args.rules)
+    golden = json.loads(Path(args.golden).read_text(encoding='utf-8')) if args.golden else None
+    recorded = {}
+    checked = 0
+    diverged = 0
+
+    corpus = list(real_logs(args.paths)) + list(synthetic_logs(args.synthetic, args.rules))
+    for name, content in corpus:
+        file_name = Path(name).name
+        if golden is None:
+            expected, actual = parse_and_compare(content, rules, file_name)
+            recorded[name] = expected
+        elif name in golden:
+            expected, actual = golden[name], new_outputs(parse_scan_log(content, rules), file_name)
+        else:
+            print(f"{name}: not in the golden file")
+            continue
+        differences = diff_outputs(expected, actual)
+        checked += 1
+        if differences:
+            diverged += 1
+            print(f"{name}:")
+            for difference in differences:
+                print(f"  {difference}")
+
+    if args.save_golden and golden is None:
+        Path(args.save_golden).write_text(json.dumps(recorded, indent=1) + "\n", encoding='utf-8')
+        print(f"Golden outputs for {len(recorded)} logs saved to {args.save_golden}")
+
+    print(f"{checked} logs checked, {diverged} diverged.")
+    return 1 if diverged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Generates synthetic Silver Scan-Tool exports for benchmarking.
+
+The ECUs of each log are taken from one variant of reference_list.json, so the
+parsers recognise them exactly as they would in a real export.
+
+    python -m benchmarks.log_generator <output dir> --files 100 [--size 200000]
+"""
+import argparse
+import random
+
+from pathlib import Path
+from constants import KEYWORD_LIST_FILE
+from modules.reference_registry import load_rules_snapshot, NON_VARIANT_KEYS
+
+# Mode headings in the order the scan tool writes them
+MODE_TITLES = {
+    "1": "Request Current Powertrain Diagnostic Data",
+    "2": "Request Powertrain Freeze Frame Data",
+    "3": "Request Emission-Related Diagnostic Trouble Codes",
+    "6": "Request On-Board Monitoring Test Results",
+    "7": "Request Emission-Related DTCs Detected During Current or Last Driving Cycle",
+    "9": "Request Vehicle Information",
+    "A": "Request Emission-Related DTCs with Permanent Status",
+}
+DTC_MODES = ("3", "7", "A")
+
+DTC_LINES = [
+    "P0420 Catalyst System Efficiency Below Threshold Bank 1",
+    "P0300 Random/Multiple Cylinder Misfire Detected",
+    "P0171 System Too Lean Bank 1",
+    "P0A80 Replace Hybrid Battery Pack",
+    "U0100 Lost Communication With ECM/PCM A",
+    "U0121 Lost Communication With Anti-Lock Brake System Module",
+    "C0035 Left Front Wheel Speed Sensor Circuit",
+    "B1000 ECU Malfunction",
+]
+PID_LINES = [
+    "PID 04 Calculated Load Value                 23.1 %",
+    "PID 05 Engine Coolant Temperature            88 degC",
+    "PID 0C Engine RPM                            812 rpm",
+    "PID 0D Vehicle Speed Sensor                  0 km/h",
+    "PID 11 Absolute Throttle Position            14.5 %",
+    "PID 42 Control Module Voltage                14.21 V",
+]
+MONITOR_LINES = [
+    "MID 01 TID 80 Oxygen Sensor Monitor Bank 1 Sensor 1    Value 0.62 Min 0.00 Max 1.20  Passed",
+    "MID 21 TID 87 Catalyst Monitor Bank 1                  Value 0.12 Min 0.00 Max 0.50  Passed",
+    "MID 31 TID 85 EGR Monitor Bank 1                       Value 12.0 Min 5.00 Max 40.0  Passed",
+]
+
+def load_variants(json_file_path=KEYWORD_LIST_FILE):
+    """Returns {variant name: [ECU header lines]} from the reference list."""
+    data = load_rules_snapshot(json_file_path).data
+    return {variant: list(ecus) for variant, ecus in data.items() if variant not in NON_VARIANT_KEYS}
+
+def generate_log(rng, ecus, modes=tuple(MODE_TITLES), dtc_density=0.2, no_response_rate=0.02, target_size=0):
+    """
+    Returns the text of one scan-tool export.
+
+    Args:
+    - rng (random.Random): Source of randomness, so logs can be reproduced from a seed.
+    - ecus (list): ECU header lines of the vehicle, e.g. "10  ECM-EngineControl".
+    - modes (iterable): Mode sections to write.
+    - dtc_density (float): Chance that an ECU reports fault codes in a DTC mode.
+    - no_response_rate (float): Chance that an ECU answers "No response" in a mode.
+    - target_size (int): Mode 1 is padded with PID readings until the log is at least this many characters.
+    """
+    lines = [
+        "Silver Scan-Tool Log Export",
+        f"VIN: {vin(rng)}",
+        f"Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "",
+    ]
+    size = sum(len(line) + 1 for line in lines)
+
+    for mode in modes:
+        section = [f"Scan-Tool Mode {mode} - {MODE_TITLES.get(mode, 'Unknown Mode')}", "-" * 60]
+        for ecu in ecus:
+            section.append(ecu)
+            if rng.random() < no_response_rate:
+                section.append("    No response")
+            elif mode in DTC_MODES:
+                codes = rng.sample(DTC_LINES, rng.randint(1, 3)) if rng.random() < dtc_density else []
+                section.append(f"    {len(codes)} fault code entries")
+                section.extend(f"    {code}" for code in codes)
+            elif mode == "1":
+                section.extend(f"    {pid}" for pid in rng.sample(PID_LINES, 3))
+            elif mode == "2":
+                section.append("    PID 02 DTC That Caused Freeze Frame          P0000")
+            elif mode == "6":
+                section.append(f"    {rng.choice(MONITOR_LINES)}")
+            elif mode == "9":
+                section.append(f"    INFOTYPE 02 Vehicle Identification Number    {vin(rng)}")
+                if "ECM" in ecu:
+                    section.append("    INFOTYPE 08\tIn-use Performance Tracking for Spark Ignition Engines")
+                    section.append(f"    OBD Monitoring Conditions Encountered Counts    {rng.randint(0, 5000)}")
+                    section.append(f"    Ignition Cycle Counter    {rng.randint(0, 5000)}")
+            section.append("")
+
+        if mode == "1":
+            # Pad with repeated readings to reach the requested file size
+            padding = max(0, target_size - size - sum(len(line) + 1 for line in section))
+            while padding > 0:
+                pid = f"    {rng.choice(PID_LINES)}"
+                section.append(pid)
+                padding -= len(pid) + 1
+
+        size += sum(len(line) + 1 for line in section)
+        lines.extend(section)
+
+    return "\n".join(lines) + "\n"
+
+def vin(rng):
+    return "YV1" + "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(14))
+
+def write_log_folder(directory, file_count, json_file_path=KEYWORD_LIST_FILE, seed=0, unique_logs=200, **log_options):
+    """
+    Writes file_count logs into directory as confirmed/pending pairs named like the
+    scan tool does (<VIN>_<date>_Confirmed.txt). At most unique_logs distinct logs
+    are generated and then reused, so large folders are quick to create.
+    Returns the list of written paths.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    variants = list(load_variants(json_file_path).values())
+
+    contents = []
+    for _ in range(min(file_count, unique_logs)):
+        contents.append(generate_log(rng, rng.choice(variants), **log_options))
+
+    paths = []
+    for index in range(file_count):
+        status = "Confirmed" if index % 2 == 0 else "Pending"
+        path = directory / f"VEHICLE{index // 2:06d}_20240101_{status}.txt"
+        path.write_text(contents[index % len(contents)], encoding='utf-8')
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Silver Scan-Tool logs for benchmarking.")
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=0, help="minimum size of each log in characters")
+    parser.add_argument("--dtc-density", type=float, default=0.2)
+    parser.add_argument("--no-response-rate", type=float, default=0.02)
+    parser.add_argument("--rules", default=KEYWORD_LIST_FILE, help="reference list the ECU variants are taken from")
+    args = parser.parse_args(argv)
+
+    paths = write_log_folder(args.directory, args.files, args.rules, args.seed, target_size=args.size,
+                             dtc_density=args.dtc_density, no_response_rate=args.no_response_rate)
+    print(f"Wrote {len(paths)} logs to {args.directory}")
+
+if __name__ == "__main__":
+    main()
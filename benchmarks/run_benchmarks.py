@@ -0,0 +1,134 @@
+"""
+Parser and folder check benchmarks on synthetic logs.
+
+    python -m benchmarks.run_benchmarks                  # 1, 1k and 50k files, compared with baseline.json
+    python -m benchmarks.run_benchmarks --sizes 1 1000   # quicker run
+    python -m benchmarks.run_benchmarks --save-baseline  # store this run as the new baseline
+
+Each benchmark reports the best of --repeat runs. When a baseline exists, any benchmark
+more than REGRESSION_THRESHOLD times slower than its baseline is reported and the exit code is 1.
+Baselines are only comparable on the same machine, so baseline.json is local and not committed:
+the first run saves one, and --save-baseline replaces it.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+from pathlib import Path
+from constants import KEYWORD_LIST_FILE
+from modules.check_errors_in_folder import check_errors_in_folder, check_file_pairs_and_duplicates
+from modules.ecu_processing import count_ecus_in_modes, find_fail_keywords, parse_scan_log
+from modules.reference_registry import load_rules_snapshot
+from benchmarks.log_generator import load_variants, generate_log, write_log_folder
+
+# Machine-specific, kept out of git
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = [1, 1000, 50000]
+REGRESSION_THRESHOLD = 1.25
+# Distinct logs generated per run; larger runs reuse them
+UNIQUE_LOGS = 200
+
+def best_time(function, repeat):
+    """Returns the fastest of repeat runs of function, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmarks(sizes, repeat, json_file_path, workers):
+    """Returns {benchmark name: seconds} for every benchmark and folder size."""
+    rules = load_rules_snapshot(json_file_path)
+    rng = random.Random(0)
+    variants = list(load_variants(json_file_path).values())
+    pool = [generate_log(rng, rng.choice(variants)) for _ in range(UNIQUE_LOGS)]
+    results = {}
+
+    for size in sizes:
+        contents = [pool[index % len(pool)] for index in range(size)]
+        # Large folders take minutes per pass, so they are run once
+        runs = repeat if size < 10000 else 1
+
+        def parse_all(parse):
+            return lambda: [parse(content) for content in contents]
+
+        parser_benchmarks = [
+            ("count_ecus_in_modes", parse_all(lambda content: count_ecus_in_modes(content, rules.flattened_reference))),
+            ("find_fail_keywords", parse_all(lambda content: find_fail_keywords(content, rules.keywords, rules.ignore_keywords))),
+            ("parse_scan_log", parse_all(lambda content: parse_scan_log(content, rules))),
+        ]
+        for name, function in parser_benchmarks:
+            results[f"{name}[{size}]"] = best_time(function, runs)
+            report(f"{name}[{size}]", results[f"{name}[{size}]"], size)
+
+        with tempfile.TemporaryDirectory() as directory:
+            write_log_folder(directory, size, json_file_path, unique_logs=UNIQUE_LOGS)
+            folder = Path(directory)
+            name = f"check_file_pairs_and_duplicates[{size}]"
+            results[name] = best_time(lambda: check_file_pairs_and_duplicates(folder), runs)
+            report(name, results[name], size)
+            name = f"check_errors_in_folder[{size}]"
+            results[name] = best_time(lambda: check_errors_in_folder(folder, json_file_path, workers=workers, use_cache=False), runs)
+            report(name, results[name], size)
+
+    return results
+
+def report(name, seconds, files):
+    print(f"{name:<42} {seconds:10.4f} s {seconds / files * 1e6:12.1f} us/file", flush=True)
+
+def compare_with_baseline(results, baseline):
+    """Prints each result against the baseline and returns the names of the regressed benchmarks."""
+    regressions = []
+    print(f"\nCompared with the baseline from {baseline.get('date', 'unknown date')} ({baseline.get('machine', '')}):")
+    for name, seconds in results.items():
+        baseline_seconds = baseline["results"].get(name)
+        if not baseline_seconds:
+            print(f"{name:<42} no baseline")
+            continue
+        ratio = seconds / baseline_seconds
+        flag = ""
+        if ratio > REGRESSION_THRESHOLD:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<42} {baseline_seconds:10.4f} s -> {seconds:10.4f} s  x{ratio:5.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the log parsers and the folder check.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="number of files per benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="processes used by check_errors_in_folder")
+    parser.add_argument("--rules", default=KEYWORD_LIST_FILE)
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.rules, args.workers)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline or not baseline_path.exists():
+        baseline = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "machine": f"{platform.platform()}, Python {platform.python_version()}",
+            "workers": args.workers,
+            "results": results,
+        }
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding='utf-8')
+        print(f"\nBaseline saved to {baseline_path}; later runs on this machine are compared with it.")
+        return 0
+
+    regressions = compare_with_baseline(results, json.loads(baseline_path.read_text(encoding='utf-8')))
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {REGRESSION_THRESHOLD}x slower than the baseline.")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,17 @@ from pathlib import Path
 
 version = "1.0.2"
 
-# Crash log directory and file
+# Crash log directory and file; the directory is created when the first report is written
 CRASH_LOG_DIRECTORY = Path("CrashLogs")
 CRASH_LOG_FILE = CRASH_LOG_DIRECTORY / "crash_report-log"
 
-# Ensure the crash log directory exists
-CRASH_LOG_DIRECTORY.mkdir(parents=True, exist_ok=True)
+# Subfolder of the scanned directory used for saved logs and analysis data
+LOG_SUBFOLDER = "Logs"
 
 # Reference list file path
-KEYWORD_LIST_FILE = 'reference_list.json'
\ No newline at end of file
+KEYWORD_LIST_FILE = 'reference_list.json'
+# Logs larger than this (in bytes) open in the memory-mapped LogViewer
+LARGE_LOG_SIZE = 20 * 1024 * 1024
+
+# Columns of the folder check results table
+RESULT_COLUMNS = ["File", "Mode", "ECU", "DTC", "Keyword Hit", "Warning"]
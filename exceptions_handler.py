@@ -3,10 +3,11 @@ import traceback
 import sys
 
 from PyQt5.QtWidgets import QMessageBox
-from constants import CRASH_LOG_FILE
+from constants import CRASH_LOG_DIRECTORY, CRASH_LOG_FILE
 
 def log_crash_to_file(exc_type, exc_value, exc_traceback):
     """Logs the uncaught exception details to a file."""
+    CRASH_LOG_DIRECTORY.mkdir(parents=True, exist_ok=True)
     with open(CRASH_LOG_FILE, "a") as crash_log:
         crash_log.write("----- Crash Report -----\n")
         crash_log.write(f"Exception Type: {exc_type.__name__}\n")
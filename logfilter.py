@@ -0,0 +1,143 @@
+"""
+Headless command line for Logfilter, for batch checks without the GUI.
+
+    python -m logfilter check <dir> [--format text|json|html] [--workers N] [--no-cache]
+    python -m logfilter watch <dir> [--format text|json|html]
+
+Uses the same analysis as the GUI and never imports PyQt5.
+check exits with 1 when errors, duplicates or missing pairs are found, and 2 on bad arguments.
+"""
+import argparse
+import html
+import json
+import re
+import sys
+
+from pathlib import Path
+from constants import KEYWORD_LIST_FILE, version
+from modules.check_errors_in_folder import check_errors_in_folder, check_file_pairs_and_duplicates, check_folder, format_detail
+from modules.profiling import ProfileCapture, request_profile
+from modules.real_time_monitoring import monitor_directory
+
+EXIT_OK = 0
+EXIT_ERRORS_FOUND = 1
+EXIT_USAGE = 2
+
+def html_to_text(fragment):
+    """Turns the <br>-separated HTML produced by process_file into plain text."""
+    text = re.sub(r'<br\s*/?>', '\n', fragment)
+    return html.unescape(re.sub(r'<[^>]+>', '', text))
+
+def run_check(args, out):
+    directory = Path(args.directory)
+
+    if args.format == "html":
+        # The same streamed report as the GUI
+        errors_found = False
+
+        def emit(fragment):
+            nonlocal errors_found
+            errors_found = errors_found or "<h2" in fragment
+            out.write(fragment)
+
+        check_errors_in_folder(directory, args.rules, workers=args.workers, use_cache=not args.no_cache, emit=emit)
+        out.write("\n")
+        return EXIT_ERRORS_FOUND if errors_found else EXIT_OK
+
+    file_pairs, duplicates, missing_pairs = check_file_pairs_and_duplicates(directory)
+    files = []
+    files_checked = 0
+    for file_path, result in check_folder(directory, args.rules, workers=args.workers, use_cache=not args.no_cache):
+        files_checked += 1
+        warning, fail_details, dtcs = result[:3]
+        if warning or fail_details:
+            files.append({"file": file_path.name, "warning": warning, "fail_details": fail_details, "dtcs": dtcs})
+
+    if args.format == "json":
+        json.dump({
+            "directory": str(directory),
+            "files_checked": files_checked,
+            "duplicates": duplicates,
+            "missing_pairs": missing_pairs,
+            "files_with_errors": files,
+        }, out, indent=2)
+        out.write("\n")
+    else:
+        if duplicates:
+            out.write("Duplicate Files Found:\n" + "".join(f"  {name}\n" for name in duplicates))
+        if missing_pairs:
+            out.write("Files with Missing Pairs:\n" + "".join(f"  {name}\n" for name in missing_pairs))
+        if files:
+            out.write("Summary of Errors:\n")
+            for entry in files:
+                out.write(f"{entry['file']}:\n")
+                if entry["warning"]:
+                    out.write(f"  {format_detail(entry['warning'])}\n")
+                for detail in entry["fail_details"]:
+                    out.write(f"  {format_detail(detail)}\n")
+        else:
+            out.write("No errors found across all files.\n")
+        out.write(f"{files_checked} files checked.\n")
+
+    return EXIT_ERRORS_FOUND if files or duplicates or missing_pairs else EXIT_OK
+
+def run_watch(args, out):
+    def emit(output):
+        if args.format == "html":
+            out.write(output + "\n")
+        elif args.format == "json":
+            out.write(json.dumps({"output": html_to_text(output)}) + "\n")
+        else:
+            out.write(html_to_text(output) + "\n")
+        out.flush()
+
+    try:
+        # Polling keeps the watcher free of Qt
+        monitor_directory(Path(args.directory), args.rules, emit, watcher_backend="polling")
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="logfilter", description=f"Logfilter {version} - Silver Scan-Tool log checks without the GUI.")
+    parser.add_argument("--rules", default=str(Path(KEYWORD_LIST_FILE).resolve()), help="path to reference_list.json")
+    parser.add_argument("--profile", action="store_true", help="write a cProfile capture of the check, or of the first watched file, to CrashLogs")
+    parser.add_argument("--profile-memory", action="store_true", help="write the top tracemalloc allocations to CrashLogs the same way")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check", help="run the full folder error check once")
+    check_parser.add_argument("directory")
+    check_parser.add_argument("--format", choices=["text", "json", "html"], default="text")
+    check_parser.add_argument("--workers", type=int, default=1, help="processes used for parsing (default 1)")
+    check_parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the analysis cache")
+    check_parser.add_argument("-o", "--output", help="write the report to this file instead of stdout")
+
+    watch_parser = subparsers.add_parser("watch", help="monitor a folder and report new logs until interrupted")
+    watch_parser.add_argument("directory")
+    watch_parser.add_argument("--format", choices=["text", "json", "html"], default="text")
+    watch_parser.add_argument("-o", "--output", help="append the output to this file instead of stdout")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not Path(args.directory).is_dir():
+        print(f"Error: '{args.directory}' is not a directory.", file=sys.stderr)
+        return EXIT_USAGE
+
+    run = run_check if args.command == "check" else run_watch
+    if args.profile or args.profile_memory:
+        if args.command == "check":
+            check = run
+            def run(args, out):
+                with ProfileCapture("cli_check", args.profile, args.profile_memory):
+                    return check(args, out)
+        else:
+            request_profile(args.profile, args.profile_memory)
+
+    if args.output:
+        with open(args.output, 'w' if args.command == "check" else 'a', encoding='utf-8') as out:
+            return run(args, out)
+    return run(args, sys.stdout)
+
+if __name__ == "__main__":
+    sys.exit(main())
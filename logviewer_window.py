@@ -1,15 +1,29 @@
-from PyQt5.QtCore import  pyqtSignal
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import  pyqtSignal, QEvent, Qt
+from PyQt5.QtGui import QIcon, QFontDatabase, QTextCursor
 from PyQt5.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
     QMainWindow,
+    QPlainTextEdit,
+    QPushButton,
+    QScrollBar,
+    QSpinBox,
+    QSplitter,
     QTextBrowser,
+    QTreeWidget,
+    QTreeWidgetItem,
     QVBoxLayout,
     QWidget,
     QMainWindow)
+from constants import KEYWORD_LIST_FILE
+from modules.ecu_processing import parse_scan_log
+from modules.mapped_log import MappedLog
+from modules.reference_registry import get_reference_registry
+from threads import LineIndexThread
 
 class LogViewer(QMainWindow):
     closed = pyqtSignal()
-    def __init__(self, log_content, file_name="", parent=None):
+    def __init__(self, log_content=None, file_name="", parent=None, file_path=None):
         super(LogViewer, self).__init__(parent)
         self.setWindowTitle(f"Log Viewer - {file_name}" if file_name else "Log Viewer")
         self.setWindowIcon(QIcon('AurobayLogo.png'))
@@ -23,18 +37,199 @@ class LogViewer(QMainWindow):
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
 
+        # Sidebar listing the mode sections and ECU headers, next to the log itself
+        splitter = QSplitter(Qt.Horizontal)
+        layout.addWidget(splitter)
+        self.sidebar = SectionSidebar(self.go_to_line)
+        self.sidebar.hide()
+        splitter.addWidget(self.sidebar)
+
+        # Large logs are memory-mapped and only the visible lines are rendered
+        self.large_log_view = None
+        if file_path is not None:
+            self.large_log_view = LargeLogView(file_path, self.sidebar)
+            splitter.addWidget(self.large_log_view)
+            splitter.setSizes([200, 600])
+            return
+
         # QTextBrowser to display the log content
         self.text_browser = QTextBrowser()
         self.text_browser.setReadOnly(True)
         self.text_browser.setOpenExternalLinks(True)  # Allow opening links if any
-        layout.addWidget(self.text_browser)
+        splitter.addWidget(self.text_browser)
+        splitter.setSizes([200, 600])
 
         # Set the log content
         if file_name.endswith('.html'):
             self.text_browser.setHtml(log_content)
         else:
             self.text_browser.setPlainText(log_content)
+            rules = get_reference_registry(KEYWORD_LIST_FILE).get()
+            scan_log = parse_scan_log(log_content, rules, find_keywords=False)
+            for mode_label, mode_line, ecus in scan_log.outline():
+                self.sidebar.add_section("mode", mode_label, mode_line)
+                for ecu_header, ecu_line in ecus:
+                    self.sidebar.add_section("ecu", ecu_header, ecu_line)
+        self.sidebar.setVisible(self.sidebar.topLevelItemCount() > 0)
+
+    def go_to_line(self, line_number):
+        """Shows line_number (0-based) at the top of the view."""
+        if self.large_log_view is not None:
+            self.large_log_view.go_to_line(line_number + 1)
+            return
+        block = self.text_browser.document().findBlockByNumber(line_number)
+        cursor = QTextCursor(block)
+        # Scroll past the line first so it ends up at the top rather than the bottom
+        self.text_browser.moveCursor(QTextCursor.End)
+        self.text_browser.setTextCursor(cursor)
+        self.text_browser.ensureCursorVisible()
     
     def closeEvent(self, event):
+        if self.large_log_view is not None:
+            self.large_log_view.close_log()
         self.closed.emit()
-        event.accept()
\ No newline at end of file
+        event.accept()
+
+class SectionSidebar(QTreeWidget):
+    """Tree of mode sections with their ECU headers; activating an entry calls go_to_line with its line."""
+    def __init__(self, go_to_line, parent=None):
+        super().__init__(parent)
+        self.setHeaderLabel("Sections")
+        self._current_mode = None
+        self.itemClicked.connect(lambda item, column: go_to_line(item.data(0, Qt.UserRole)))
+
+    def add_section(self, kind, label, line_number):
+        item = QTreeWidgetItem([label])
+        item.setData(0, Qt.UserRole, line_number)
+        if kind == "ecu" and self._current_mode is not None:
+            self._current_mode.addChild(item)
+        else:
+            self.addTopLevelItem(item)
+            if kind == "mode":
+                self._current_mode = item
+
+class LargeLogView(QWidget):
+    """
+    Shows a memory-mapped log a window of lines at a time.
+
+    The line index is built by a LineIndexThread; the scroll bar grows as it
+    progresses and the lines already indexed can be read and jumped to at once.
+    Mode and ECU sections found while indexing are added to the sidebar.
+    """
+    def __init__(self, file_path, sidebar, parent=None):
+        super().__init__(parent)
+        rules = get_reference_registry(KEYWORD_LIST_FILE).get()
+        self.mapped_log = MappedLog(file_path, ecu_names=rules.flattened_reference)
+        self.sidebar = sidebar
+        self.sections_shown = 0
+        self.first_line = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Jump-to-line controls and indexing status
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Line:"))
+        self.line_spin_box = QSpinBox()
+        self.line_spin_box.setRange(1, 1)
+        controls.addWidget(self.line_spin_box)
+        self.go_button = QPushButton("Go")
+        controls.addWidget(self.go_button)
+        self.status_label = QLabel("Indexing...")
+        controls.addWidget(self.status_label, 1)
+        layout.addLayout(controls)
+
+        # The text view only ever holds the visible lines; the separate scroll bar spans the whole file
+        view_layout = QHBoxLayout()
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text_view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.text_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.text_view.viewport().installEventFilter(self)
+        self.text_view.installEventFilter(self)
+        view_layout.addWidget(self.text_view)
+        self.scroll_bar = QScrollBar(Qt.Vertical)
+        self.scroll_bar.setRange(0, 0)
+        view_layout.addWidget(self.scroll_bar)
+        layout.addLayout(view_layout)
+
+        self.scroll_bar.valueChanged.connect(self.show_lines_from)
+        self.go_button.clicked.connect(lambda: self.go_to_line(self.line_spin_box.value()))
+
+        self.index_thread = LineIndexThread(self.mapped_log)
+        self.index_thread.progress_signal.connect(self.index_progress)
+        self.index_thread.finished_signal.connect(self.index_finished)
+        self.index_thread.start()
+
+    def visible_line_count(self):
+        return max(1, self.text_view.viewport().height() // self.text_view.fontMetrics().lineSpacing())
+
+    def update_scroll_range(self):
+        line_count = self.mapped_log.line_count
+        self.scroll_bar.setRange(0, max(0, line_count - self.visible_line_count()))
+        self.scroll_bar.setPageStep(self.visible_line_count())
+        self.line_spin_box.setRange(1, max(1, line_count))
+
+    def index_progress(self, line_count):
+        self.update_scroll_range()
+        self.status_label.setText(f"Indexing... {line_count} lines")
+        # Section offsets map straight to lines through the index, without scanning the file
+        for byte_offset, kind, label in self.mapped_log.sections[self.sections_shown:]:
+            self.sidebar.add_section(kind, label, self.mapped_log.line_at_offset(byte_offset))
+        self.sections_shown = len(self.mapped_log.sections)
+        self.sidebar.setVisible(self.sections_shown > 0)
+        # Fill the view while the first screen of lines becomes available
+        if self.text_view.blockCount() < self.visible_line_count():
+            self.show_lines_from(self.first_line)
+
+    def index_finished(self):
+        self.index_progress(self.mapped_log.line_count)
+        self.status_label.setText(f"{self.mapped_log.line_count} lines")
+
+    def show_lines_from(self, first_line):
+        """Renders the lines visible from first_line (0-based)."""
+        self.first_line = first_line
+        self.text_view.setPlainText('\n'.join(self.mapped_log.lines(first_line, self.visible_line_count())))
+
+    def go_to_line(self, line_number):
+        """Scrolls so that line_number (1-based) is the first visible line."""
+        self.scroll_bar.setValue(line_number - 1)
+        self.show_lines_from(self.scroll_bar.value())
+
+    def eventFilter(self, watched, event):
+        # The text view has no scroll range of its own, so scrolling input is redirected to the scroll bar
+        if event.type() == QEvent.Wheel:
+            steps = event.angleDelta().y() // 120
+            self.scroll_bar.setValue(self.scroll_bar.value() - steps * 3)
+            return True
+        if event.type() == QEvent.KeyPress:
+            key_steps = {
+                Qt.Key_Up: -1,
+                Qt.Key_Down: 1,
+                Qt.Key_PageUp: -self.scroll_bar.pageStep(),
+                Qt.Key_PageDown: self.scroll_bar.pageStep(),
+            }
+            if event.key() in key_steps:
+                self.scroll_bar.setValue(self.scroll_bar.value() + key_steps[event.key()])
+                return True
+            if event.key() == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+                self.scroll_bar.setValue(0)
+                return True
+            if event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+                self.scroll_bar.setValue(self.scroll_bar.maximum())
+                return True
+        return super().eventFilter(watched, event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scroll_range()
+        self.show_lines_from(self.scroll_bar.value())
+
+    def close_log(self):
+        # No more progress updates once the mapping is about to be closed
+        self.index_thread.progress_signal.disconnect()
+        self.index_thread.finished_signal.disconnect()
+        self.index_thread.stop()
+        self.index_thread.wait()
+        self.mapped_log.close()
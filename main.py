@@ -1,31 +1,39 @@
 # Version 1.0.2
 
+import time
+
+# Taken before the Qt imports so the startup profile covers them
+STARTUP_TIME = time.perf_counter()
+
 import sys
+import multiprocessing
 
 from PyQt5 import QtWidgets
-from PyQt5.QtCore import QSettings
-from PyQt5.QtGui import QIcon, QTextCursor
+from PyQt5.QtCore import QSettings, QTimer
+from PyQt5.QtGui import QIcon, QTextBlockFormat, QTextCharFormat, QTextCursor
 from PyQt5.QtWidgets import (
     QMainWindow,
     QFileDialog,
     QMainWindow,
     QApplication,
+    QInputDialog,
     QMessageBox)
 from ui import Ui_Logfilter
 from functools import partial
 from pathlib import Path
-from modules.ecu_processing import  load_keywords_from_json
 from datetime import datetime
 from functools import partial
-from logviewer_window import LogViewer
-from threads import MonitoringThread, FullFolderCheckThread
 from exceptions_handler import handle_uncaught_exception
-from constants import CRASH_LOG_FILE, CRASH_LOG_DIRECTORY, KEYWORD_LIST_FILE, version
-from modules.keywords_editor import KeywordsEditorDialog
+from constants import CRASH_LOG_FILE, CRASH_LOG_DIRECTORY, KEYWORD_LIST_FILE, LOG_SUBFOLDER, LARGE_LOG_SIZE, version
+from modules.live_log import LiveLogModel
+from modules.performance import performance_stats
+from results_table import ResultsTableModel, create_results_proxy
+# The analysis engine, worker threads, log viewer and keywords editor are imported when first used
 
-# Load keywords globally
+IMPORTS_DONE_TIME = time.perf_counter()
+
+# Reference list shared by the monitoring threads and the keywords editor
 json_file_path = Path(KEYWORD_LIST_FILE).resolve()
-keywords = load_keywords_from_json(json_file_path)
 
 class MainWindow(QMainWindow, Ui_Logfilter):
     def __init__(self, parent=None):
@@ -49,7 +57,7 @@ class MainWindow(QMainWindow, Ui_Logfilter):
         self.settings = QSettings("Aurobay", "Logfilter")
 
         # Define log subfolder path
-        self.LOG_SUBFOLDER = "Logs"
+        self.LOG_SUBFOLDER = LOG_SUBFOLDER
 
         # Load recent directories from external file
         self.recent_directories = self.load_recent_directories()
@@ -83,6 +91,11 @@ class MainWindow(QMainWindow, Ui_Logfilter):
         self.actionSharepoint_Check_N_A.triggered.connect(self.sharepoint_check)
         self.actionAbout.triggered.connect(self.about)
         self.actionEdit_Keywords.triggered.connect(self.show_keywords_editor)
+        self.actionFolder_Check_Workers.triggered.connect(self.set_folder_check_workers)
+        self.actionResults_Table.toggled.connect(self.set_results_table_enabled)
+        self.actionShadow_Mode.toggled.connect(self.set_shadow_mode)
+        self.actionPerformance.triggered.connect(self.show_performance_dialog)
+        self.actionProfile_Next_Run.triggered.connect(self.profile_next_run)
 
         # Connect the comboBox currentIndexChanged signal to the method
         self.comboBox_directory.currentIndexChanged.connect(self.combo_box_selection_changed)
@@ -97,8 +110,36 @@ class MainWindow(QMainWindow, Ui_Logfilter):
         # List to keep references to open LogViewer windows
         self.log_viewers = []
 
-        # Ensure the Logs subfolder exists
-        self.ensure_log_directory()
+        # Bounded, deduplicated model behind the live output pane, flushed to the view in batches
+        self.live_log = LiveLogModel(max_blocks=int(self.settings.value("live_log_max_blocks", 5000)),
+                                     flush_interval=int(self.settings.value("live_log_flush_interval", 50)),
+                                     batch_size=int(self.settings.value("live_log_batch_size", 100)))
+        self.live_log_timer = QTimer(self)
+        self.live_log_timer.setSingleShot(True)
+        self.live_log_timer.setInterval(self.live_log.flush_interval)
+        self.live_log_timer.timeout.connect(self.flush_live_log)
+        # Flushing pauses while the user drags the scroll bar or has scrolled up, and resumes at the bottom.
+        # Only user scrolling changes this; appends can leave the bar short of its maximum.
+        self.live_log_scrolled_up = False
+        self.textBrowser_log.verticalScrollBar().actionTriggered.connect(self.live_log_scrolled)
+        self.textBrowser_log.verticalScrollBar().sliderReleased.connect(self.live_log_scrolled)
+
+        # Folder check results table; sorting and filtering happen in the proxy
+        self.results_model = ResultsTableModel(self)
+        self.results_proxy = create_results_proxy(self.results_model, self)
+        self.tableView_results.setModel(self.results_proxy)
+        self.lineEdit_results_filter.textChanged.connect(self.results_proxy.setFilterFixedString)
+        self.actionResults_Table.setChecked(self.settings.value("results_table", False, type=bool))
+
+        # Shadow mode runs the original parser next to the optimised one and logs any divergence
+        self.actionShadow_Mode.setChecked(self.settings.value("shadow_mode", False, type=bool))
+
+        # Per-stage timings, viewed in Settings > Performance; off unless turned on there
+        performance_stats.enabled = self.settings.value("performance_stats", False, type=bool)
+        self.performance_dialog = None
+
+        # Ensure the Logs subfolder exists once the window is shown, the folder may be on a slow network share
+        QTimer.singleShot(0, self.ensure_log_directory)
 
         # Connect the Clear button to the clear_log method
         self.pushButton_clear.clicked.connect(self.clear_log)
@@ -231,9 +272,11 @@ class MainWindow(QMainWindow, Ui_Logfilter):
             QMessageBox.warning(self, "Warning", "Please select a directory before starting monitoring.")
             return
 
+        from threads import MonitoringThread, FullFolderCheckThread
+
         if self.radioButton_real_time.isChecked():
             # Start real-time monitoring
-            self.monitoring_thread = MonitoringThread(self.current_directory, json_file_path)
+            self.monitoring_thread = MonitoringThread(self.current_directory, json_file_path, shadow=self.actionShadow_Mode.isChecked())
             self.monitoring_thread.output_signal.connect(self.update_output)
             self.monitoring_thread.finished_signal.connect(self.monitoring_finished)
             self.monitoring_thread.start()
@@ -242,9 +285,14 @@ class MainWindow(QMainWindow, Ui_Logfilter):
             self.label_status_value.setText("Monitoring...")
             self.label_status_value.setStyleSheet("color: green;")
         elif self.radioButton_full_folder_check.isChecked():
-            # Start full folder error check
-            self.full_folder_thread = FullFolderCheckThread(self.current_directory, json_file_path)
+            # Start full folder error check; the report is appended as it streams in
+            self.start_full_log()
+            self.full_folder_thread = FullFolderCheckThread(self.current_directory, json_file_path, workers=self.folder_check_workers(),
+                                                            results_table=self.actionResults_Table.isChecked(),
+                                                            shadow=self.actionShadow_Mode.isChecked())
             self.full_folder_thread.output_signal.connect(self.update_full_folder_output)
+            self.full_folder_thread.rows_signal.connect(self.append_result_rows)
+            self.full_folder_thread.progress_signal.connect(self.update_folder_progress)
             self.full_folder_thread.finished_signal.connect(self.full_folder_finished)
             self.full_folder_thread.start()
             self.pushButton_start.setEnabled(False)
@@ -267,26 +315,108 @@ class MainWindow(QMainWindow, Ui_Logfilter):
         self.label_status_value.setStyleSheet("color: red;")
 
     def append_log(self, text):
-        #Appends text to the log and scrolls to the bottom.
-        existing_text = self.textBrowser_log.toPlainText()
-        if text not in existing_text:
-            self.textBrowser_log.append(text)
+        #Queues text for the log; duplicates of recent entries are dropped. A full batch is flushed right away.
+        if not self.live_log.add(text):
+            return
+        if self.live_log.batch_ready():
+            self.live_log_timer.start(0)
+        elif not self.live_log_timer.isActive():
+            self.live_log_timer.start(self.live_log.flush_interval)
+
+    def live_log_paused(self):
+        #True while the user drags the scroll bar or has scrolled away from the bottom of the log.
+        return self.textBrowser_log.verticalScrollBar().isSliderDown() or self.live_log_scrolled_up
+
+    def live_log_scrolled(self, action=None):
+        #The scroll bar only moves after actionTriggered, so its position is read once the event is handled.
+        QTimer.singleShot(0, self.update_live_log_scroll_state)
+
+    def update_live_log_scroll_state(self):
+        #Pauses the live log when the user has scrolled up and flushes what was queued once they are back at the bottom.
+        scroll_bar = self.textBrowser_log.verticalScrollBar()
+        self.live_log_scrolled_up = scroll_bar.value() < scroll_bar.maximum()
+        if self.live_log.has_pending() and not self.live_log_timer.isActive() and not self.live_log_paused():
+            self.live_log_timer.start(0)
+
+    def flush_live_log(self):
+        #Appends a batch of queued entries as one document edit and scrolls to the bottom.
+        if not self.live_log.has_pending() or self.live_log_paused():
+            return
+        # Oldest blocks are evicted by the document once the limit is reached
+        with performance_stats.stage("View: live log update"):
+            document = self.textBrowser_log.document()
+            document.setMaximumBlockCount(self.live_log.max_blocks)
+            cursor = QTextCursor(document)
+            cursor.movePosition(QTextCursor.End)
+            cursor.beginEditBlock()
+            for text in self.live_log.take_pending(self.live_log.batch_size):
+                # One paragraph per entry, as QTextEdit.append does, without carrying over the previous formatting
+                if not document.isEmpty():
+                    cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+                cursor.insertHtml(text)
+            cursor.endEditBlock()
             self.textBrowser_log.moveCursor(QTextCursor.End)
+            scroll_bar = self.textBrowser_log.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
+        # The rest of a burst follows in later batches, so each flush does a bounded amount of work
+        if self.live_log.has_pending():
+            self.live_log_timer.start(self.live_log.flush_interval)
 
     def set_full_log(self, html_text):
         #Sets the entire log with HTML content and scrolls to the bottom.
+        self.live_log.clear()
+        self.live_log_scrolled_up = False
         self.textBrowser_log.clear()
+        # The folder check report is never truncated
+        self.textBrowser_log.document().setMaximumBlockCount(0)
         self.textBrowser_log.setHtml(html_text)
         self.textBrowser_log.moveCursor(QTextCursor.End)
 
+    def start_full_log(self):
+        #Clears the log and results table for a streamed folder check report.
+        self.results_model.clear()
+        self.live_log.clear()
+        self.live_log_scrolled_up = False
+        self.textBrowser_log.clear()
+        # The folder check report is never truncated
+        self.textBrowser_log.document().setMaximumBlockCount(0)
+        from modules.check_errors_in_folder import REPORT_CSS
+        self.textBrowser_log.document().setDefaultStyleSheet(REPORT_CSS)
+
+    def append_full_log(self, html_fragment):
+        #Appends a batch of report fragments at the end of the log and scrolls to the bottom.
+        with performance_stats.stage("View: report update"):
+            cursor = QTextCursor(self.textBrowser_log.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertHtml(html_fragment)
+            self.textBrowser_log.moveCursor(QTextCursor.End)
+
+    def append_result_rows(self, rows):
+        #Adds a batch of folder check findings to the results table.
+        with performance_stats.stage("View: results table update"):
+            self.results_model.append_rows(rows)
+
+    def update_folder_progress(self, progress):
+        #Shows the files done, throughput and estimated time left of the folder check.
+        if not self.full_folder_thread.isRunning():
+            return
+        text = (f"Processing... {progress['files_done']}/{progress['files_total']} files, "
+                f"{progress['bytes_per_sec'] / (1024 * 1024):.1f} MB/s")
+        if progress['eta'] is not None and progress['files_done'] < progress['files_total']:
+            minutes, seconds = divmod(int(progress['eta']), 60)
+            text += f", {minutes}:{seconds:02d} left"
+        self.label_status_value.setText(text)
+
     def update_output(self, text):
         self.append_log(text)
 
     def update_full_folder_output(self, text):
-        self.set_full_log(text)
+        self.append_full_log(text)
 
     def clear_log(self):
         #Clears the content of the text browser.
+        self.live_log.clear()
+        self.live_log_scrolled_up = False
         self.textBrowser_log.clear()
         self.label_status_value.setText("Log cleared")
         self.label_status_value.setStyleSheet("color: blue;")
@@ -424,11 +554,18 @@ class MainWindow(QMainWindow, Ui_Logfilter):
                 if selected_file.suffix.lower() == '.html':
                     content = selected_file.read_text(encoding='utf-8')
                     # Optionally, parse or process HTML as needed
+                elif selected_file.stat().st_size > LARGE_LOG_SIZE:
+                    # Large plain-text logs are memory-mapped by the viewer instead of read up front
+                    content = None
                 else:
                     content = selected_file.read_text(encoding='utf-8')
 
                 # Create and show the LogViewer window
-                log_viewer = LogViewer(log_content=content, file_name=selected_file.name)
+                from logviewer_window import LogViewer
+                if content is None:
+                    log_viewer = LogViewer(file_name=selected_file.name, file_path=selected_file)
+                else:
+                    log_viewer = LogViewer(log_content=content, file_name=selected_file.name)
                 log_viewer.show()
 
                 # Connect the closed signal to remove the reference
@@ -458,14 +595,65 @@ class MainWindow(QMainWindow, Ui_Logfilter):
 
     def show_keywords_editor(self):
         """Opens the keywords editor dialog"""
+        from modules.keywords_editor import KeywordsEditorDialog
         dialog = KeywordsEditorDialog(self)
         if dialog.exec_():
-            # Reload keywords after editing
-            global keywords
-            keywords = load_keywords_from_json(json_file_path)
+            # The editor invalidates the shared reference registry, so the next file uses the new keywords
             self.label_status_value.setText("Keywords updated")
             self.label_status_value.setStyleSheet("color: green;")
 
+    def folder_check_workers(self):
+        """Returns the number of processes used by the full folder check (1 = no parallelism)."""
+        return int(self.settings.value("folder_check_workers", 1))
+
+    def set_folder_check_workers(self):
+        """Lets the user choose how many processes the full folder check uses."""
+        workers, ok = QInputDialog.getInt(
+            self,
+            "Folder Check Workers",
+            "Number of processes for the full folder check (1 = off):",
+            self.folder_check_workers(),
+            1,
+            multiprocessing.cpu_count()
+        )
+        if ok:
+            self.settings.setValue("folder_check_workers", workers)
+            self.label_status_value.setText(f"Folder check workers set to {workers}")
+            self.label_status_value.setStyleSheet("color: green;")
+
+    def set_results_table_enabled(self, enabled):
+        """Shows folder check findings in the sortable results table instead of the HTML log."""
+        self.settings.setValue("results_table", enabled)
+        self.widget_results.setVisible(enabled)
+
+    def show_performance_dialog(self):
+        """Opens the Performance dialog; it stays open and refreshes while monitoring or checking."""
+        from modules.performance_dialog import PerformanceDialog
+        if self.performance_dialog is None:
+            self.performance_dialog = PerformanceDialog(self.settings, self.log_directory, self)
+        self.performance_dialog.log_directory = Path(self.log_directory)
+        self.performance_dialog.refresh_timer.start()
+        self.performance_dialog.show()
+        self.performance_dialog.raise_()
+
+    def profile_next_run(self):
+        """Arms a cProfile and/or tracemalloc capture of the next monitored file or folder check."""
+        from modules.profiling import request_profile
+        choices = list(PROFILE_CHOICES)
+        choice, ok = QInputDialog.getItem(self, "Profile Next Run", "Capture for the next monitored file or folder check:",
+                                          choices, 0, False)
+        if ok:
+            request_profile(*PROFILE_CHOICES[choice])
+            self.label_status_value.setText("Profiling armed: results are written to CrashLogs")
+            self.label_status_value.setStyleSheet("color: blue;")
+
+    def set_shadow_mode(self, enabled):
+        """Checks every parsed log against the original parser functions; divergences go to the Logs subfolder."""
+        self.settings.setValue("shadow_mode", enabled)
+        if enabled:
+            self.label_status_value.setText("Shadow parser check on: divergences are logged to the Logs folder")
+            self.label_status_value.setStyleSheet("color: blue;")
+
     def about(self):
         QMessageBox.about(
             self,
@@ -493,14 +681,74 @@ class MainWindow(QMainWindow, Ui_Logfilter):
             self.label_status_value.setText("Mode set to Full Folder Error Check")
             self.label_status_value.setStyleSheet("color: blue;")
 
+STARTUP_PROFILE_FLAG = "--startup-profile"
+# Arm a capture of the first monitored file or folder check from the command line
+PROFILE_FLAG = "--profile"
+PROFILE_MEMORY_FLAG = "--profile-memory"
+# Menu choice -> (cpu, memory)
+PROFILE_CHOICES = {
+    "CPU (cProfile)": (True, False),
+    "Memory (tracemalloc)": (False, True),
+    "CPU and memory": (True, True),
+}
+
+def write_startup_profile(app_time, window_time):
+    """
+    Writes how long each startup phase took to CrashLogs, and prints it when there is a console;
+    use python -X importtime for a per-module breakdown.
+    """
+    shown_time = time.perf_counter()
+    deferred = ["threads", "logviewer_window", "modules.check_errors_in_folder", "modules.keywords_editor"]
+    report = "\n".join([
+        "Startup profile:",
+        f"  Imports:          {(IMPORTS_DONE_TIME - STARTUP_TIME) * 1000:.0f} ms",
+        f"  QApplication:     {(app_time - IMPORTS_DONE_TIME) * 1000:.0f} ms",
+        f"  MainWindow setup: {(window_time - app_time) * 1000:.0f} ms",
+        f"  First event loop: {(shown_time - window_time) * 1000:.0f} ms",
+        f"  Total:            {(shown_time - STARTUP_TIME) * 1000:.0f} ms, {len(sys.modules)} modules loaded",
+        f"  Deferred modules not yet loaded: {', '.join(name for name in deferred if name not in sys.modules)}",
+    ]) + "\n"
+
+    # The packaged build has no console, so the file is the place to look
+    report_path = CRASH_LOG_DIRECTORY / f"startup_profile_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+    try:
+        CRASH_LOG_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as report_file:
+            report_file.write(report)
+    except OSError as e:
+        report += f"Could not write {report_path}: {e}\n"
+    else:
+        report += f"Written to: {report_path}\n"
+    if sys.stdout is not None:
+        print(report, end="")
+
 # Main execution block
 def main():
+    # Required for the folder check worker processes in the frozen build
+    multiprocessing.freeze_support()
+
     # Set the global exception hook
     sys.excepthook = handle_uncaught_exception
 
+    profile_startup = STARTUP_PROFILE_FLAG in sys.argv
+    if profile_startup:
+        sys.argv.remove(STARTUP_PROFILE_FLAG)
+
+    profile_cpu = PROFILE_FLAG in sys.argv
+    profile_memory = PROFILE_MEMORY_FLAG in sys.argv
+    if profile_cpu or profile_memory:
+        from modules.profiling import request_profile
+        request_profile(profile_cpu, profile_memory)
+        sys.argv = [arg for arg in sys.argv if arg not in (PROFILE_FLAG, PROFILE_MEMORY_FLAG)]
+
     app = QApplication(sys.argv)
+    app_time = time.perf_counter()
     window = MainWindow()
+    window_time = time.perf_counter()
     window.show()
+    if profile_startup:
+        # Runs once the event loop has painted the window
+        QTimer.singleShot(0, lambda: write_startup_profile(app_time, window_time))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import sqlite3
+
+from pathlib import Path
+
+# Bump when parse results change shape or meaning so old cache entries are ignored.
+# Never go back to an earlier number, caches written with it may still be around.
+CACHE_VERSION = 5
+CACHE_FILE_NAME = "analysis_cache.sqlite"
+
+def rules_hash(json_file_path):
+    """Returns a hash of the reference list contents, combined with the cache version."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    try:
+        digest.update(Path(json_file_path).read_bytes())
+    except OSError as e:
+        print(f"Error: Could not read '{json_file_path}' for the cache key: {e}")
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """
+    On-disk cache of per-file analyze_file results, stored as SQLite in the Logs subfolder.
+
+    An entry is used only when the file name, size, mtime_ns and rules hash all match,
+    so changed files and files affected by a reference list edit are parsed again.
+    """
+    def __init__(self, db_path, rules_hash):
+        self.db_path = Path(db_path)
+        self.rules_hash = rules_hash
+        self.connection = sqlite3.connect(self.db_path)
+
+        # A cache written by another version is dropped rather than migrated
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            with self.connection:
+                self.connection.execute("DROP TABLE IF EXISTS results")
+                self.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, rules_hash TEXT, result TEXT)"
+        )
+        # Load every entry for the current rules up front; one query beats thousands of lookups
+        rows = self.connection.execute(
+            "SELECT name, size, mtime_ns, result FROM results WHERE rules_hash = ?",
+            (self.rules_hash,)
+        )
+        self._entries = {name: (size, mtime_ns, result) for name, size, mtime_ns, result in rows}
+        self._pending_writes = []
+
+    def get(self, file_path, stat_result):
+        """Returns the cached analyze_file result for the file, or None on a miss."""
+        entry = self._entries.get(file_path.name)
+        if entry is None or entry[0] != stat_result.st_size or entry[1] != stat_result.st_mtime_ns:
+            return None
+        # JSON turns the tuples inside each result list into lists; turn them back
+        return tuple(
+            [tuple(item) if isinstance(item, list) else item for item in field] if isinstance(field, list) else field
+            for field in json.loads(entry[2])
+        )
+
+    def put(self, file_path, stat_result, result):
+        """Stores a freshly computed analyze_file result for the file."""
+        self._pending_writes.append((
+            file_path.name, stat_result.st_size, stat_result.st_mtime_ns, self.rules_hash, json.dumps(result)
+        ))
+        if len(self._pending_writes) >= 500:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered entries to disk in a single transaction."""
+        if not self._pending_writes:
+            return
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", self._pending_writes)
+        self._pending_writes = []
+
+    def prune(self, keep_names):
+        """Removes entries for files that are no longer in the folder."""
+        self.flush()
+        keep_names = set(keep_names)
+        stale = [(name,) for (name,) in self.connection.execute("SELECT name FROM results") if name not in keep_names]
+        if stale:
+            with self.connection:
+                self.connection.executemany("DELETE FROM results WHERE name = ?", stale)
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+def open_analysis_cache(log_directory, json_file_path):
+    """
+    Opens the analysis cache in the given Logs directory, creating it if needed.
+    Returns None if the cache cannot be used, e.g. on a read-only share.
+    """
+    try:
+        log_directory = Path(log_directory)
+        log_directory.mkdir(parents=True, exist_ok=True)
+        return AnalysisCache(log_directory / CACHE_FILE_NAME, rules_hash(json_file_path))
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: Analysis cache disabled: {e}")
+        return None
@@ -1,6 +1,15 @@
+import multiprocessing
+import time
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
 from pathlib import Path
-from modules.ecu_processing import load_ecu_reference, count_ecus_in_modes, load_keywords_from_json, find_fail_keywords
-import winsound
+from constants import LOG_SUBFOLDER
+from modules.analysis_cache import open_analysis_cache
+from modules.ecu_processing import ParseCancelled, parse_scan_log
+from modules.equivalence import shadow_check, SHADOW_LOG_FILE_NAME
+from modules.performance import performance_stats
+from modules.reference_registry import get_reference_registry
 import re
 
 def format_detail(detail):
@@ -44,19 +53,218 @@ def check_file_pairs_and_duplicates(directory):
     # Return only three values
     return file_pairs, duplicates, missing_pairs
 
-def check_errors_in_folder(folder_path, json_file_path, is_running=lambda: True):
+# How often the folder check looks at is_running() while waiting for a worker process
+CANCEL_POLL_INTERVAL = 0.02
+
+# Set by the pool initializer in folder check worker processes; stops a running parse when set
+_worker_cancel_event = None
+
+def _init_worker(cancel_event):
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+def _worker_is_running():
+    return not _worker_cancel_event.is_set()
+
+def analyze_file(file_path, rules, shadow_log=None, is_running=None):
     """
-    Scans through all files in the given folder, processes each file, and checks for errors.
-    Summarizes which files have errors based on specified keywords. Additionally, checks for duplicate files
-    and ensures there is a corresponding "pending" logfile for every "confirmed" logfile and vice versa.
+    Parses a single log file and returns its (warning, fail_details, dtcs, keyword_hits),
+    where dtcs holds (mode, ECU header, DTC line) tuples and keyword_hits is ScanLog.keyword_hits.
+    With shadow_log, the original parser functions are run as well and divergences are logged there.
+    Raises ParseCancelled if is_running() returns False during the parse; in a worker process
+    the pool's cancel event is used instead.
+    Kept at module level so it can be sent to worker processes.
+    """
+    if is_running is None and _worker_cancel_event is not None:
+        is_running = _worker_is_running
+
+    with performance_stats.stage("Folder: read"):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            file_content = file.read()
+
+    # Parse the file once to find ECUs, faults, keyword hits and any warnings
+    with performance_stats.stage("Folder: parse"):
+        scan_log = parse_scan_log(file_content, rules, is_running=is_running)
+    if shadow_log is not None:
+        with performance_stats.stage("Folder: shadow check"):
+            shadow_check(file_path.name, file_content, rules, scan_log, shadow_log)
+    dtcs = [entry for section in scan_log.sections for entry in section.dtc_entries()]
+    return scan_log.warning, scan_log.fail_details, dtcs, scan_log.keyword_hits
+
+def result_rows(file_name, result):
+    """Returns one results table row per warning, keyword hit and DTC of an analyze_file result."""
+    warning, _, dtcs, keyword_hits = result
+    rows = []
+    if warning:
+        rows.append((file_name, "", "", "", "", warning))
+    # Keyword hits carry the real mode name, like the DTC rows, rather than the section index of fail_details
+    for mode, ecu, line in keyword_hits:
+        rows.append((file_name, f"Mode {mode}" if mode else "", ecu, "", line, ""))
+    for mode, ecu, dtc in dtcs:
+        rows.append((file_name, f"Mode {mode}", ecu, dtc, "", ""))
+    return rows
+
+def analyze_files(file_paths, rules, workers=1, is_running=lambda: True, cache=None, shadow_log=None):
+    """
+    Yields (file_path, analyze_file result) for each file, in the order given.
+    Stops early once is_running() returns False, also in the middle of parsing a file.
+
+    With workers > 1 the files are parsed in a process pool. Only a small window of
+    files is in flight at a time; when stopping, the workers are told to abandon it.
+    Files with a valid entry in cache are not parsed at all.
+    """
+    def cached_result(file_path):
+        if cache is None:
+            return None, None
+        with performance_stats.stage("Folder: cache lookup"):
+            stat_result = file_path.stat()
+            return stat_result, cache.get(file_path, stat_result)
+
+    def store(file_path, stat_result, result):
+        if cache is not None:
+            cache.put(file_path, stat_result, result)
+
+    if workers <= 1:
+        for file_path in file_paths:
+            if not is_running():
+                return
+            stat_result, result = cached_result(file_path)
+            if result is None:
+                try:
+                    result = analyze_file(file_path, rules, shadow_log, is_running)
+                except ParseCancelled:
+                    return
+                store(file_path, stat_result, result)
+            yield file_path, result
+        return
+
+    cancel_event = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cancel_event,))
+    try:
+        pending = deque()
+        file_iter = iter(file_paths)
+
+        def submit_next():
+            # Queue files up to and including the next cache miss. Cache hits are
+            # queued as completed futures so the output order is unaffected.
+            for file_path in file_iter:
+                stat_result, result = cached_result(file_path)
+                if result is not None:
+                    future = Future()
+                    future.set_result(result)
+                    pending.append((file_path, stat_result, future, False))
+                    continue
+                future = executor.submit(analyze_file, file_path, rules, shadow_log)
+                pending.append((file_path, stat_result, future, True))
+                return
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending and is_running():
+            file_path, stat_result, future, parsed = pending.popleft()
+            with performance_stats.stage("Folder: wait for workers"):
+                # Wait in short steps so a stop is noticed while a large file is being parsed
+                result = None
+                while result is None and is_running():
+                    try:
+                        result = future.result(timeout=CANCEL_POLL_INTERVAL)
+                    except TimeoutError:
+                        pass
+                    except ParseCancelled:
+                        break
+            if result is None:
+                return
+            if parsed:
+                store(file_path, stat_result, result)
+                submit_next()
+            if not is_running():
+                return
+            yield file_path, result
+    finally:
+        # Workers still parsing a file see the event and drop it; a stop does not wait for them to exit
+        cancel_event.set()
+        executor.shutdown(wait=is_running(), cancel_futures=True)
+
+class FolderProgress:
+    """
+    Counts the files and bytes done in a folder check and passes a progress dict to emit,
+    at most once every interval seconds and once more when finished:
+    files_done, files_total, bytes_done, bytes_total, bytes_per_sec and eta (seconds, or None
+    until the throughput is known).
+    """
+    def __init__(self, emit, files_total, bytes_total, interval=0.25):
+        self.emit = emit
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.interval = interval
+        self.files_done = 0
+        self.bytes_done = 0
+        self._start = self._last_emit = time.monotonic()
+
+    def advance(self, size):
+        self.files_done += 1
+        self.bytes_done += size
+        if time.monotonic() - self._last_emit >= self.interval:
+            self.flush()
+
+    def flush(self):
+        now = time.monotonic()
+        self._last_emit = now
+        elapsed = now - self._start
+        bytes_per_sec = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        eta = (self.bytes_total - self.bytes_done) / bytes_per_sec if bytes_per_sec > 0 else None
+        self.emit({
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "bytes_per_sec": bytes_per_sec,
+            "eta": eta,
+        })
+
+def check_folder(folder_path, json_file_path, is_running=lambda: True, workers=1, use_cache=True, shadow=False, progress=None):
     """
-    # Load ECU reference data and error keywords
-    keywords, ignore_keywords = load_keywords_from_json(json_file_path)
-    flattened_reference = load_ecu_reference(json_file_path)
+    Yields (file_path, analyze_file result) for every log in the folder, in glob order.
+    This is the analysis behind check_errors_in_folder, without any report formatting.
+
+    With use_cache, results are read from and written to the analysis cache in the folder's
+    Logs subfolder, and entries for deleted files are pruned after a complete run.
+    In shadow mode every file is parsed, bypassing the cache, and checked against the original
+    parser functions; divergences are logged to SHADOW_LOG_FILE_NAME in the Logs subfolder.
+    If progress is given, it receives FolderProgress dicts as files are checked.
+    """
+    # Compiled ECU reference data and error keywords
+    rules = get_reference_registry(json_file_path).get()
+
+    directory = Path(folder_path)
+    file_paths = list(directory.glob('*.txt'))
+    # File sizes up front, for the byte counts and the ETA
+    sizes = {file_path: file_path.stat().st_size for file_path in file_paths} if progress is not None else None
+    tracker = FolderProgress(progress, len(file_paths), sum(sizes.values())) if progress is not None else None
+    shadow_log = None
+    if shadow:
+        shadow_log = directory / LOG_SUBFOLDER / SHADOW_LOG_FILE_NAME
+        shadow_log.parent.mkdir(parents=True, exist_ok=True)
+    cache = open_analysis_cache(directory / LOG_SUBFOLDER, json_file_path) if use_cache and not shadow else None
+    try:
+        for file_path, result in analyze_files(file_paths, rules, workers, is_running, cache, shadow_log):
+            if performance_stats.enabled or tracker is not None:
+                size = sizes[file_path] if sizes is not None else file_path.stat().st_size
+                performance_stats.add_file(size)
+                if tracker is not None:
+                    tracker.advance(size)
+            yield file_path, result
+        if tracker is not None:
+            tracker.flush()
+        if cache is not None and is_running():
+            cache.prune(file_path.name for file_path in file_paths)
+    finally:
+        if cache is not None:
+            cache.close()
 
-    # Initialize the output string with CSS styles
-    output = """
-    <style>
+# Styles used by the folder check report
+REPORT_CSS = """
         body { font-family: Arial, sans-serif; }
         h2 { color: #2E8B57; } /* Green headings */
         h3 { color: #4682B4; } /* Blue subheadings */
@@ -64,61 +272,116 @@ def check_errors_in_folder(folder_path, json_file_path, is_running=lambda: True)
         li { margin-bottom: 5px; }
         .error { color: red; }
         .warning { color: red; }
-    </style>
+"""
+
+class ReportBuilder:
+    """
+    Collects the folder check report as a list of HTML fragments.
+
+    Without emit, the fragments are kept and getvalue() returns the whole report.
+    With emit, fragments are passed on in batches of up to batch_size, or whenever
+    batch_interval seconds have passed, and are not kept in memory.
+    Each fragment is a complete block of HTML, so batches can be appended to a view as they arrive.
+    combine turns a batch into what is emitted; pass list to batch other items, such as table rows.
     """
+    def __init__(self, emit=None, batch_size=100, batch_interval=0.25, combine=''.join):
+        self.emit = emit
+        self.combine = combine
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._parts = []
+        self._last_emit = time.monotonic()
+
+    def add(self, fragment):
+        self._parts.append(fragment)
+        if self.emit is not None:
+            if len(self._parts) >= self.batch_size or time.monotonic() - self._last_emit >= self.batch_interval:
+                self.flush()
+
+    def flush(self):
+        """Emits any pending fragments."""
+        if self.emit is not None and self._parts:
+            self.emit(self.combine(self._parts))
+            self._parts = []
+            self._last_emit = time.monotonic()
+
+    def getvalue(self):
+        return self.combine(self._parts)
+
+def format_file_errors(file_name, warning, fail_details):
+    """Returns the report fragment for one file with errors."""
+    parts = [f"<h3>{file_name}:</h3><ul>"]
+    if warning:
+        formatted_warning = format_detail(warning)
+        parts.append(f"<li class='warning'>{formatted_warning}</li>")
+    if fail_details:
+        for detail in fail_details:
+            formatted_detail = format_detail(detail)
+            parts.append(f"<li>{formatted_detail}</li>")
+    parts.append("</ul>")
+    return ''.join(parts)
+
+def check_errors_in_folder(folder_path, json_file_path, is_running=lambda: True, workers=1, use_cache=True, emit=None, emit_rows=None, shadow=False,
+                           progress=None):
+    """
+    Scans through all files in the given folder, processes each file, and checks for errors.
+    Summarizes which files have errors based on specified keywords. Additionally, checks for duplicate files
+    and ensures there is a corresponding "pending" logfile for every "confirmed" logfile and vice versa.
+
+    Set workers above 1 to parse the files in that many processes. The report order is the same either way.
+    With use_cache, per-file results are kept in the folder's Logs subfolder and unchanged files are not re-parsed.
+    With shadow, every file is also checked against the original parser functions (see check_folder).
+
+    Returns the report as HTML. If emit is given, the report is instead streamed to emit in batches
+    of fragments as files are checked, and an empty string is returned.
+    If emit_rows is given, the per-file findings are streamed to it as batches of RESULT_COLUMNS rows
+    and the HTML report only gives the number of files with errors.
+    If progress is given, it receives the files and bytes done, throughput and ETA (see FolderProgress).
+    """
+    # Start the report with CSS styles
+    report = ReportBuilder(emit)
+    report.add(f"""
+    <style>{REPORT_CSS}    </style>
+    """)
 
     # Get file pairs, duplicates, and missing pairs
     directory = Path(folder_path)
-    file_pairs, duplicates, missing_pairs = check_file_pairs_and_duplicates(directory)
+    with performance_stats.stage("Folder: pairs and duplicates"):
+        file_pairs, duplicates, missing_pairs = check_file_pairs_and_duplicates(directory)
 
     # Handle duplicates
     if duplicates:
-        output += "<h2>Duplicate Files Found:</h2><ul>"
-        for duplicate in duplicates:
-            output += f"<li>{duplicate}</li>"
-        output += "</ul>"
+        report.add("<h2>Duplicate Files Found:</h2><ul>" + ''.join(f"<li>{duplicate}</li>" for duplicate in duplicates) + "</ul>")
 
     # Handle missing pairs
     if missing_pairs:
-        output += "<h2 class='error'>Files with Missing Pairs:</h2><ul>"
-        for missing_pair in missing_pairs:
-            output += f"<li>{missing_pair}</li>"
-        output += "</ul>"
-
-    # Store errors found for final summary
-    error_summary = {}
+        report.add("<h2 class='error'>Files with Missing Pairs:</h2><ul>" + ''.join(f"<li>{missing_pair}</li>" for missing_pair in missing_pairs) + "</ul>")
+    report.flush()
 
-    # Iterate over all text files in the folder
-    for file_path in directory.glob('*.txt'):
-        if not is_running():
-            return output + "<p>Process was stopped by the user.</p>"
-        with open(file_path, 'r', encoding='utf-8') as file:
-            file_content = file.read()
+    # Iterate over all text files in the folder, reporting each file with errors as soon as it is checked
+    files_with_errors = 0
+    rows = ReportBuilder(emit_rows, combine=list) if emit_rows is not None else None
+    for file_path, result in check_folder(directory, json_file_path, is_running, workers, use_cache, shadow, progress):
+        with performance_stats.stage("Folder: format report"):
+            if rows is not None:
+                for row in result_rows(file_path.name, result):
+                    rows.add(row)
+            warning, fail_details = result[:2]
+            if warning or fail_details:
+                files_with_errors += 1
+                if rows is None:
+                    if files_with_errors == 1:
+                        report.add("<h2>Summary of Errors:</h2>")
+                    report.add(format_file_errors(file_path.name, warning, fail_details))
 
-        # Process the file content to find ECUs, faults, and generate any warnings
-        ecu_counts, detailed_faults, warning = count_ecus_in_modes(file_content, flattened_reference)
-
-        # Check for specific failures or keywords
-        fail_details = find_fail_keywords(file_content, keywords, ignore_keywords)
-
-        # Aggregate error information
-        if warning or fail_details:
-            error_summary[file_path.name] = {"warning": warning, "fail_details": fail_details}
-
-    # Build summary of errors across all files
-    if error_summary:
-        output += "<h2>Summary of Errors:</h2>"
-        for file_name, errors in error_summary.items():
-            output += f"<h3>{file_name}:</h3><ul>"
-            if errors["warning"]:
-                formatted_warning = format_detail(errors["warning"])
-                output += f"<li class='warning'>{formatted_warning}</li>"
-            if errors["fail_details"]:
-                for detail in errors["fail_details"]:
-                    formatted_detail = format_detail(detail)
-                    output += f"<li>{formatted_detail}</li>"
-            output += "</ul>"
-    else:
-        output += "<p>No errors found across all files.</p>"
+    if rows is not None:
+        rows.flush()
+        if files_with_errors:
+            report.add(f"<h2>Summary of Errors:</h2><p>{files_with_errors} files with errors are listed in the results table.</p>")
+    if not is_running():
+        report.add("<p>Process was stopped by the user.</p>")
+    elif not files_with_errors:
+        report.add("<p>No errors found across all files.</p>")
 
-    return output
\ No newline at end of file
+    report.flush()
+    return report.getvalue()
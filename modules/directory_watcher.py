@@ -0,0 +1,127 @@
+import os
+import time
+
+from pathlib import Path
+
+class PollingWatcher:
+    """Reports a possible change every interval seconds. Works everywhere, including network shares."""
+    def __init__(self, directory, interval=5):
+        self.directory = Path(directory)
+        self.interval = interval
+        self._last_check = time.monotonic()
+
+    def wait_for_change(self, timeout):
+        """Waits up to timeout seconds; returns True when the directory should be scanned again."""
+        remaining = self.interval - (time.monotonic() - self._last_check)
+        if remaining > timeout:
+            time.sleep(timeout)
+            return False
+        time.sleep(max(remaining, 0))
+        self._last_check = time.monotonic()
+        return True
+
+    def watch_files(self, paths):
+        pass
+
+    def take_changed_files(self):
+        """Polling only learns about changes by listing the directory."""
+        return []
+
+    def close(self):
+        pass
+
+class QtDirectoryWatcher:
+    """
+    Wakes up as soon as QFileSystemWatcher reports a change in the directory, so the
+    directory is only listed when something actually happened.
+
+    A directory notification only covers files being created, deleted or renamed, so the
+    logs themselves are watched as well, to notice one being overwritten in place. File
+    notifications do not wake the caller: the paths are collected and handed out by
+    take_changed_files() on the next tick, so a log written in many small appends costs
+    one stat per tick rather than a directory listing per append.
+
+    Must be created and used in the same thread. Change notifications can be lost on
+    some network shares, so a scan is also requested every fallback_interval seconds.
+    """
+    def __init__(self, directory, fallback_interval=30):
+        from PyQt5.QtCore import QEventLoop, QFileSystemWatcher, QTimer
+
+        self.directory = Path(directory)
+        self.fallback_interval = fallback_interval
+        self._changed = False
+        self._changed_files = set()
+        self._watch_limit_reported = False
+        self._last_change = time.monotonic()
+
+        self._watcher = QFileSystemWatcher()
+        if not self._watcher.addPath(str(self.directory)):
+            raise OSError(f"QFileSystemWatcher cannot watch {self.directory}")
+
+        self._loop = QEventLoop()
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._loop.quit)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+        # The logs already there; later ones are added through watch_files
+        with os.scandir(self.directory) as entries:
+            self.watch_files(entry.path for entry in entries if entry.name.lower().endswith('.txt'))
+
+    def watch_files(self, paths):
+        """Starts watching the given log files for rewrites; files replaced by a rename have to be added again."""
+        watched = set(self._watcher.files())
+        new_paths = [str(path) for path in paths if str(path) not in watched]
+        if not new_paths:
+            return
+        failed = self._watcher.addPaths(new_paths)
+        if failed and not self._watch_limit_reported:
+            # Typically the inotify watch limit; those files are still found by the fallback scan
+            self._watch_limit_reported = True
+            print(f"Cannot watch {len(failed)} log files for changes, rewrites of those are found by the periodic scan.")
+
+    def take_changed_files(self):
+        """Returns the files reported as changed since the last call, each once."""
+        changed_files, self._changed_files = self._changed_files, set()
+        return [Path(path) for path in changed_files]
+
+    def _on_directory_changed(self, path):
+        self._changed = True
+        self._loop.quit()
+
+    def _on_file_changed(self, path):
+        # Collected until the current wait ends, so repeated writes to a file are handled once
+        self._changed_files.add(path)
+
+    def wait_for_change(self, timeout):
+        """Waits up to timeout seconds; returns True when the directory should be listed again."""
+        if not self._changed:
+            self._timer.start(int(timeout * 1000))
+            self._loop.exec_()
+            self._timer.stop()
+
+        if self._changed or time.monotonic() - self._last_change >= self.fallback_interval:
+            self._changed = False
+            self._last_change = time.monotonic()
+            return True
+        return False
+
+    def close(self):
+        self._watcher.removePath(str(self.directory))
+        if self._watcher.files():
+            self._watcher.removePaths(self._watcher.files())
+
+def create_directory_watcher(directory, backend="auto", interval=5):
+    """
+    Returns a watcher for the directory.
+    backend is "qt", "polling" or "auto" (Qt when available, polling otherwise).
+    """
+    if backend in ("auto", "qt"):
+        try:
+            return QtDirectoryWatcher(directory)
+        except (ImportError, OSError) as e:
+            if backend == "qt":
+                raise
+            print(f"Falling back to polling the directory: {e}")
+    return PollingWatcher(directory, interval)
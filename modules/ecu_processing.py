@@ -1,16 +1,27 @@
 import json
 import re
 
+from functools import lru_cache
+
+def keywords_from_data(data):
+    """Returns (keywords, ignore_keywords) from the parsed reference list."""
+    if 'keywords' not in data:
+        raise KeyError("The key 'keywords' is missing from the JSON data.")
+    return data['keywords'], data.get('ignore_keywords', [])
+
+def ecu_reference_from_data(data):
+    """Returns the set of ECU names listed in the parsed reference list."""
+    return {
+        ecu.split()[1] for key, sublist in data.items()
+        if key != 'keywords'
+        for ecu in sublist
+    }
+
 def load_keywords_from_json(json_file_path):
     try:
         with open(json_file_path) as json_file:
             data = json.load(json_file)
-            if 'keywords' not in data:
-                raise KeyError("The key 'keywords' is missing from the JSON data.")
-            
-            keywords = data['keywords']
-            ignore_keywords = data.get('ignore_keywords', [])
-            return keywords, ignore_keywords
+            return keywords_from_data(data)
         
     except FileNotFoundError:
         print(f"Error: The file '{json_file_path}' was not found.")
@@ -29,11 +40,7 @@ def load_ecu_reference(json_file_path):
     try:
         with open(json_file_path) as json_file:
             data = json.load(json_file)
-            flattened_reference = {
-            ecu.split()[1] for key, sublist in data.items()
-            if key != 'keywords'
-            for ecu in sublist
-        }
+            flattened_reference = ecu_reference_from_data(data)
         return flattened_reference
     except FileNotFoundError:
         print(f"Error: The file '{json_file_path}' was not found.")
@@ -123,28 +130,52 @@ def count_ecus_in_modes(content, flattened_reference):
 #             return version
 #     return "Unknown version"
 
+class KeywordMatcher:
+    """
+    Matches a line against all fail keywords and ignore keywords in one regex search each.
+    Matching is case-insensitive and an ignore keyword on the line always wins.
+    """
+    def __init__(self, keywords, ignore_keywords):
+        self.keywords = tuple(keywords)
+        self.ignore_keywords = tuple(ignore_keywords)
+        self._keyword_pattern = _compile_keyword_pattern(self.keywords)
+        self._ignore_pattern = _compile_keyword_pattern(self.ignore_keywords)
+
+    def matches(self, line_lower):
+        """Returns True if the lowercased line contains a keyword and no ignore keyword."""
+        if self._keyword_pattern is None:
+            return False
+        if self._ignore_pattern is not None and self._ignore_pattern.search(line_lower):
+            return False
+        return self._keyword_pattern.search(line_lower) is not None
+
+def _compile_keyword_pattern(keywords):
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+
+@lru_cache(maxsize=8)
+def _cached_keyword_matcher(keywords, ignore_keywords):
+    return KeywordMatcher(keywords, ignore_keywords)
+
+def get_keyword_matcher(keywords, ignore_keywords):
+    """Returns a compiled KeywordMatcher, reused for as long as the keyword lists are unchanged."""
+    return _cached_keyword_matcher(tuple(keywords), tuple(ignore_keywords))
+
 def find_fail_keywords(file_content, keywords, ignore_keywords):
     sections = file_content.split("Scan-Tool Mode")
     fail_details = []
+    matcher = get_keyword_matcher(keywords, ignore_keywords)
 
     # Iterate through sections with enumeration to keep track of section index
     for index, section in enumerate(sections):
         lines = section.split('\n')
-        
-        for line in lines:
-            line_lower = line.lower()
-
-            should_ignore = False
-            for ignore_keyword in ignore_keywords:
-                if ignore_keyword.lower() in line_lower:
-                    should_ignore = True
-                    break
-            if not should_ignore:
-                for keyword in keywords:
-                    if keyword.lower() in line_lower:
-                        # Append a tuple containing the section index and the line
-                        fail_details.append((f"Mode {index}", line.strip()))
-                        break
+        lines_lower = section.lower().split('\n')
+
+        for line, line_lower in zip(lines, lines_lower):
+            if matcher.matches(line_lower):
+                # Append a tuple containing the section index and the line
+                fail_details.append((f"Mode {index}", line.strip()))
 
     return fail_details
 
@@ -171,3 +202,213 @@ def find_recent_fueled_ignition_data(log_content):
 
     return None
 
+
+# Modes reported on by the ECU count comparison and the fault listing
+FAULT_MODES = ["1", "2", "3", "6", "7", "9", "A"]
+
+IGNITION_START_PHASE = "INFOTYPE 08\tIn-use Performance Tracking for Spark Ignition Engines"
+# parse_scan_log asks is_running() once per section and every this many lines
+CANCEL_CHECK_LINES = 1024
+FAULT_COUNT_PATTERN = re.compile(r"\d+\s+fault code entries")
+
+# Line kinds of the ECU/DTC grammar inside a mode section, as returned by tokenize_section
+LINE_ECU_HEADER = 1
+LINE_DTC = 2
+LINE_FAULT_COUNT = 3
+LINE_PID = 4
+
+def tokenize_section(lines, flattened_reference, first_line=2, is_running=None):
+    """
+    Classifies the lines of a mode section, from first_line on, by the ECU/DTC line grammar.
+
+    Returns (line number, kind, stripped line) for every line that is an ECU header
+    (second word is a known ECU name), an "N fault code entries" summary, a PID line
+    or a fault code entry. Each line is stripped once and at most its first two words
+    are split off; blank and other lines are left out.
+
+    Follows the rules of count_ecus_in_modes, which splits every line up to three times.
+    If is_running is given, it is checked every CANCEL_CHECK_LINES lines as in parse_scan_log.
+    """
+    tokens = []
+    for line_number in range(first_line, len(lines)):
+        if is_running is not None and not line_number % CANCEL_CHECK_LINES and not is_running():
+            raise ParseCancelled()
+        stripped = lines[line_number].strip()
+        if not stripped:
+            continue
+        words = stripped.split(None, 2)
+        if len(words) > 1 and words[1] in flattened_reference:
+            kind = LINE_ECU_HEADER
+        elif "fault code entries" in stripped:
+            if FAULT_COUNT_PATTERN.search(stripped):
+                kind = LINE_FAULT_COUNT
+            else:
+                kind = LINE_PID if stripped.startswith("PID") else LINE_DTC
+        elif stripped[0] in "PUCB":
+            kind = LINE_PID if stripped.startswith("PID") else LINE_DTC
+        else:
+            continue
+        tokens.append((line_number, kind, stripped))
+    return tokens
+
+class ParseCancelled(Exception):
+    """Raised by parse_scan_log when is_running() returns False part way through a log."""
+
+class EcuBlock:
+    """An ECU header line inside a mode section together with the DTC lines listed under it."""
+    def __init__(self, header, line_number):
+        self.header = header
+        self.line_number = line_number
+        self.dtcs = []
+
+class ModeSection:
+    """One "Scan-Tool Mode" section of a log file, starting at line_number (0-based)."""
+    def __init__(self, index, name, line_number):
+        self.index = index
+        self.name = name
+        self.line_number = line_number
+        self.ecu_blocks = []
+
+    def dtc_entries(self):
+        """Returns (mode, ECU header, DTC line) for every fault line in the section."""
+        return [(self.name, block.header, dtc) for block in self.ecu_blocks for dtc in block.dtcs]
+
+class ScanLog:
+    """
+    Structured result of a single pass over a Silver Scan-Tool log.
+
+    Attributes:
+    - sections (list): ModeSection objects in file order.
+    - ecu_counts (dict): The count of ECUs in different modes.
+    - mode_faults (dict): The ECU headers and fault codes for the modes in FAULT_MODES.
+    - warning (str): A warning if ECU counts are not the same in all modes.
+    - fail_details (list): (section label, line) tuples for lines matching the fail keywords.
+      The label is "Mode <section index>", as find_fail_keywords reports it.
+    - keyword_hits (list): The same lines as (mode, ECU header, line), with the real mode name
+      of the section and the ECU block the line is in; both are "" where there is none.
+    - ignition_cycle_counter (int): The fueled ignition cycle counter, or None if not found.
+    """
+    def __init__(self, fault_modes=FAULT_MODES):
+        self.sections = []
+        self.ecu_counts = {}
+        self.mode_faults = {mode: [] for mode in fault_modes}
+        self.warning = ""
+        self.fail_details = []
+        self.keyword_hits = []
+        self.ignition_cycle_counter = None
+
+    def outline(self):
+        """
+        Returns the section index used for navigation:
+        (mode label, line number, [(ECU header, line number), ...]) per mode section.
+        """
+        return [
+            (f"Mode {section.name}", section.line_number,
+             [(block.header, block.line_number) for block in section.ecu_blocks if block.header])
+            for section in self.sections
+        ]
+
+def parse_scan_log(content, rules, find_keywords=True, is_running=None):
+    """
+    Parses a log file in one pass and returns a ScanLog.
+
+    rules is the RulesSnapshot of the reference list; its compiled matcher and ECU set are
+    used as they are, so no configuration work is done per line. Keyword hits are skipped
+    when find_keywords is False.
+
+    Produces the same results as count_ecus_in_modes, find_fail_keywords and
+    find_recent_fueled_ignition_data, but the content is split and walked only once.
+
+    If is_running is given, it is checked regularly and ParseCancelled is raised once it
+    returns False, so stopping does not wait for a large log to be parsed to the end.
+    """
+    fault_modes = rules.fault_modes
+    scan_log = ScanLog(fault_modes)
+    matcher = rules.matcher if find_keywords else None
+    flattened_reference = rules.flattened_reference
+    ignition_section_found = False
+    # Line number of the first line of the current section; a split in mid-line shares that line
+    line_base = 0
+
+    for index, section in enumerate(content.split("Scan-Tool Mode")):
+        if is_running is not None and not is_running():
+            raise ParseCancelled()
+        lines = section.split("\n")
+        lines_lower = section.lower().split("\n") if matcher is not None else None
+        mode_section = None
+        mode_ecus = set()
+        block = None
+        # (line number, line) of the keyword hits in this section, placed in their ECU block below
+        section_hits = []
+
+        if index > 0:
+            mode_section = ModeSection(index, lines[0].split("-")[0].strip(), line_base)
+            scan_log.sections.append(mode_section)
+            faults = scan_log.mode_faults.get(mode_section.name)
+
+        for line_number, line in enumerate(lines):
+            if is_running is not None and not line_number % CANCEL_CHECK_LINES and not is_running():
+                raise ParseCancelled()
+
+            # Keyword hits, where ignore keywords take precedence
+            if matcher is not None and matcher.matches(lines_lower[line_number]):
+                stripped_hit = line.strip()
+                scan_log.fail_details.append((f"Mode {index}", stripped_hit))
+                section_hits.append((line_number, stripped_hit))
+
+            # Ignition cycle counter, only searched after the INFOTYPE 08 heading
+            if scan_log.ignition_cycle_counter is None:
+                if not ignition_section_found:
+                    start_index = line.find(IGNITION_START_PHASE)
+                    if start_index != -1:
+                        ignition_section_found = True
+                        scan_log.ignition_cycle_counter = _ignition_counter_in_line(line[start_index:])
+                else:
+                    scan_log.ignition_cycle_counter = _ignition_counter_in_line(line)
+
+        # ECU blocks and fault codes, skipping the mode heading and the line below it
+        hit_index = 0
+        if mode_section is not None:
+            for token_number, (line_number, kind, stripped) in enumerate(tokenize_section(lines, flattened_reference, is_running=is_running)):
+                if is_running is not None and not token_number % CANCEL_CHECK_LINES and not is_running():
+                    raise ParseCancelled()
+                # Keyword hits above this line belong to the block before it
+                while hit_index < len(section_hits) and section_hits[hit_index][0] < line_number:
+                    scan_log.keyword_hits.append((mode_section.name, block.header if block else "", section_hits[hit_index][1]))
+                    hit_index += 1
+                if kind == LINE_ECU_HEADER:
+                    mode_ecus.add(stripped)
+                    block = EcuBlock(stripped, line_base + line_number)
+                    mode_section.ecu_blocks.append(block)
+                    if faults is not None:
+                        faults.append(stripped)
+                elif kind == LINE_DTC and faults is not None:
+                    if block is None:
+                        # Fault lines before the first ECU header get a block without a header
+                        block = EcuBlock("", line_base + line_number)
+                        mode_section.ecu_blocks.append(block)
+                    block.dtcs.append(stripped)
+                    faults.append(stripped)
+        mode_name = mode_section.name if mode_section is not None else ""
+        for line_number, stripped_hit in section_hits[hit_index:]:
+            scan_log.keyword_hits.append((mode_name, block.header if block else "", stripped_hit))
+
+        if mode_section is not None:
+            scan_log.ecu_counts[mode_section.name] = len(mode_ecus)
+        line_base += len(lines) - 1
+
+    # Comparing ECU counts across modes and generating a warning if necessary
+    reference_count = scan_log.ecu_counts.get(fault_modes[0], 0)
+    if any(scan_log.ecu_counts.get(mode, 0) != reference_count for mode in fault_modes):
+        scan_log.warning = "Warning: ECU counts are not the same in all modes."
+
+    return scan_log
+
+def _ignition_counter_in_line(line):
+    """Returns the first number on an "Ignition Cycle Counter" line, or None."""
+    if 'Ignition Cycle Counter' not in line:
+        return None
+    for part in line.split():
+        if part.isdigit():
+            return int(part)
+    return None
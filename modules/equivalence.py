@@ -0,0 +1,83 @@
+import json
+
+from datetime import datetime
+from modules.ecu_processing import count_ecus_in_modes, find_fail_keywords, find_recent_fueled_ignition_data, parse_scan_log
+
+# Divergences found in shadow mode are appended here, inside the Logs subfolder
+SHADOW_LOG_FILE_NAME = "shadow_divergences.log"
+
+def legacy_outputs(content, rules, file_name):
+    """Returns the structured results of the original parser functions for one log."""
+    # Imported here because real_time_monitoring imports this module for shadow mode
+    from modules.real_time_monitoring import compare_status_with_logfile
+
+    ecu_counts, mode_faults, warning = count_ecus_in_modes(content, rules.flattened_reference)
+    return normalize({
+        "ecu_counts": ecu_counts,
+        "mode_faults": mode_faults,
+        "warning": warning,
+        "fail_details": find_fail_keywords(content, rules.keywords, rules.ignore_keywords),
+        "ignition_cycle_counter": find_recent_fueled_ignition_data(content),
+        "status": compare_status_with_logfile(file_name, mode_faults),
+    })
+
+def new_outputs(scan_log, file_name):
+    """Returns the same structured results from a parse_scan_log ScanLog."""
+    from modules.real_time_monitoring import compare_status_with_logfile
+
+    return normalize({
+        "ecu_counts": scan_log.ecu_counts,
+        "mode_faults": scan_log.mode_faults,
+        "warning": scan_log.warning,
+        "fail_details": scan_log.fail_details,
+        "ignition_cycle_counter": scan_log.ignition_cycle_counter,
+        "status": compare_status_with_logfile(file_name, scan_log.mode_faults),
+    })
+
+def normalize(outputs):
+    """Converts tuples to lists so results compare equal to ones read back from JSON."""
+    return json.loads(json.dumps(outputs))
+
+def diff_outputs(expected, actual):
+    """Returns a description of every field that differs between two sets of outputs."""
+    differences = []
+    for key in expected.keys() | actual.keys():
+        expected_value, actual_value = expected.get(key), actual.get(key)
+        if expected_value == actual_value:
+            continue
+        if isinstance(expected_value, dict) and isinstance(actual_value, dict):
+            for mode in sorted(expected_value.keys() | actual_value.keys()):
+                if expected_value.get(mode) != actual_value.get(mode):
+                    differences.append(f"{key}[{mode}]: expected {expected_value.get(mode)!r}, got {actual_value.get(mode)!r}")
+        elif isinstance(expected_value, list) and isinstance(actual_value, list):
+            index = next((i for i, (a, b) in enumerate(zip(expected_value, actual_value)) if a != b),
+                         min(len(expected_value), len(actual_value)))
+            differences.append(f"{key}: {len(expected_value)} expected, {len(actual_value)} found, first difference at {index}: "
+                               f"expected {expected_value[index:index + 1]!r}, got {actual_value[index:index + 1]!r}")
+        else:
+            differences.append(f"{key}: expected {expected_value!r}, got {actual_value!r}")
+    return sorted(differences)
+
+def shadow_check(file_name, content, rules, scan_log, log_path):
+    """
+    Runs the original parser functions on a log the app has just parsed with parse_scan_log
+    and appends any difference to log_path. Returns the list of differences.
+    Errors in the check are logged, never raised, so shadow mode cannot break processing.
+    """
+    try:
+        differences = diff_outputs(legacy_outputs(content, rules, file_name), new_outputs(scan_log, file_name))
+    except Exception as e:
+        differences = [f"shadow check failed: {e}"]
+    if differences:
+        print(f"Shadow mode: {len(differences)} divergence(s) in {file_name}")
+        try:
+            with open(log_path, 'a', encoding='utf-8') as log_file:
+                timestamp = datetime.now().isoformat(timespec='seconds')
+                log_file.writelines(f"{timestamp} {file_name}: {difference}\n" for difference in differences)
+        except OSError as e:
+            print(f"Could not write the shadow mode log {log_path}: {e}")
+    return differences
+
+def parse_and_compare(content, rules, file_name):
+    """Parses a log both ways and returns (legacy outputs, new outputs)."""
+    return legacy_outputs(content, rules, file_name), new_outputs(parse_scan_log(content, rules), file_name)
@@ -1,3 +1,8 @@
+import hashlib
+import json
+import os
+import time
+
 from pathlib import Path
 # from window_management import bring_window_to_front
 
@@ -21,4 +26,226 @@ def find_new_txt_files(directory_path, processed_files):
             processed_files.add(file.name)
             new_files.append(file)
             #bring_window_to_front()
-    return new_files
\ No newline at end of file
+    return new_files
+
+class SettlingFiles:
+    """
+    Holds newly detected files until the scan tool has finished writing them.
+
+    A file counts as settled once it is non-empty and its size and mtime have not
+    changed for settle_time seconds. Only the pending files are stat'ed on each check.
+    """
+    def __init__(self, settle_time=1.0):
+        self.settle_time = settle_time
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, file_path):
+        # Re-adding a pending file must not restart its settle timer
+        if file_path not in self._pending:
+            self._pending[file_path] = (None, time.monotonic())
+
+    def pop_settled(self):
+        """Returns the files that are ready to be processed and stops tracking them."""
+        settled = []
+        now = time.monotonic()
+        for file_path, (last_signature, stable_since) in list(self._pending.items()):
+            try:
+                stat_result = file_path.stat()
+            except FileNotFoundError:
+                # Removed before it was ever complete
+                del self._pending[file_path]
+                continue
+            except OSError:
+                # E.g. a share that is briefly unreachable; checked again on the next call
+                continue
+            signature = (stat_result.st_size, stat_result.st_mtime_ns)
+            if signature != last_signature:
+                self._pending[file_path] = (signature, now)
+            elif stat_result.st_size > 0 and now - stable_since >= self.settle_time:
+                settled.append(file_path)
+                del self._pending[file_path]
+        return settled
+
+
+def file_signature(file_path):
+    """Returns the file's (size, mtime_ns), or None if it no longer exists."""
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def file_content_hash(file_path):
+    """Returns a hash of the file's bytes, or None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError as e:
+        print(f"An error occurred: {e}")
+        return None
+    return digest.hexdigest()
+
+
+# Journal of analysed file versions, kept in the Logs subfolder of the monitored directory
+JOURNAL_FILE_NAME = "monitoring_journal.jsonl"
+
+
+class ProcessedFiles:
+    """
+    Remembers which version of each log file has been analysed, as
+    name -> (size, mtime_ns, content hash).
+
+    A file is reported again when its size or mtime changes. The content hash
+    then tells a real rewrite apart from a file that was only touched.
+
+    With a journal_path, every analysed version is appended to that file so the
+    next monitoring session can pick up exactly the files that changed meanwhile.
+    """
+    def __init__(self, journal_path=None):
+        self._states = {}
+        self.journal_path = Path(journal_path) if journal_path else None
+        self._journal = None
+        # Reported once per outage rather than on every scan
+        self._listing_failed = False
+
+    def __contains__(self, name):
+        return name in self._states
+
+    def start_session(self, directory_path):
+        """
+        Loads the journal of earlier sessions. Without one, every log currently in the
+        directory is taken as already analysed, as on a first start.
+        The journal is then compacted to one line per file and opened for appending.
+        """
+        if not self._load_journal():
+            self.record_existing(directory_path)
+        if self.journal_path is None:
+            return
+        try:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.journal_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as temp_file:
+                for name, state in self._states.items():
+                    temp_file.write(_journal_line(name, state))
+            os.replace(temp_path, self.journal_path)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        except OSError as e:
+            print(f"Error: Monitoring journal disabled: {e}")
+            self._journal = None
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _load_journal(self):
+        if self.journal_path is None or not self.journal_path.exists():
+            return False
+        try:
+            with open(self.journal_path, encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                        self._states[entry["name"]] = (entry["size"], entry["mtime_ns"], entry["hash"])
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        # A line cut short by a crash; later lines are still usable
+                        continue
+        except OSError as e:
+            print(f"Error: Could not read the monitoring journal: {e}")
+            return False
+        return True
+
+    def record_existing(self, directory_path):
+        """Marks every log currently in the directory as already analysed."""
+        try:
+            entries = _scan_txt_files(directory_path)
+        except OSError as e:
+            print(f"Error: Could not list {directory_path}: {e}")
+            return
+        for entry, stat_result in entries:
+            self._states[entry.name] = (stat_result.st_size, stat_result.st_mtime_ns, None)
+
+    def find_changed(self, directory_path):
+        """
+        Returns the logs that are new or whose size or mtime differ from the analysed version.
+        While the directory cannot be listed, e.g. a disconnected share, nothing is returned
+        and the next call tries again.
+        """
+        try:
+            entries = _scan_txt_files(directory_path)
+        except OSError as e:
+            if not self._listing_failed:
+                print(f"Error: Could not list {directory_path}, retrying: {e}")
+                self._listing_failed = True
+            return []
+        self._listing_failed = False
+        changed = []
+        for entry, stat_result in entries:
+            state = self._states.get(entry.name)
+            if state is None or state[:2] != (stat_result.st_size, stat_result.st_mtime_ns):
+                changed.append(Path(entry.path))
+        return changed
+
+    def find_changed_files(self, file_paths):
+        """Like find_changed, but only stats the given files; files that no longer exist are left out."""
+        changed = []
+        for file_path in file_paths:
+            try:
+                stat_result = file_path.stat()
+            except OSError:
+                continue
+            state = self._states.get(file_path.name)
+            if state is None or state[:2] != (stat_result.st_size, stat_result.st_mtime_ns):
+                changed.append(file_path)
+        return changed
+
+    def has_same_content(self, file_path, content_hash):
+        """Returns True if the file's content matches the version already analysed."""
+        state = self._states.get(file_path.name)
+        return state is not None and content_hash is not None and state[2] == content_hash
+
+    def mark(self, file_path, content_hash, signature):
+        """
+        Records a version of the file as analysed. signature is its file_signature, taken
+        before the content was hashed and read, so a rewrite during the analysis is still
+        seen as a change. A signature of None means the file was deleted.
+        """
+        if signature is None:
+            self._states.pop(file_path.name, None)
+            return
+        state = (*signature, content_hash)
+        self._states[file_path.name] = state
+        if self._journal is not None:
+            self._journal.write(_journal_line(file_path.name, state))
+            self._journal.flush()
+
+
+def _journal_line(name, state):
+    size, mtime_ns, content_hash = state
+    return json.dumps({"name": name, "size": size, "mtime_ns": mtime_ns, "hash": content_hash}) + "\n"
+
+
+def _scan_txt_files(directory_path):
+    """
+    Returns (entry, stat result) for every log in the directory. Files deleted or renamed
+    between the listing and the stat are left out; OSError is raised if the directory
+    itself cannot be listed.
+    """
+    # os.scandir reuses the directory listing for stat() on Windows, unlike glob + stat
+    files = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith('.txt'):
+                continue
+            try:
+                if entry.is_file():
+                    files.append((entry, entry.stat()))
+            except FileNotFoundError:
+                continue
+    return files
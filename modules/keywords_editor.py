@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (QDialog,
 import json
 import os
 from constants import KEYWORD_LIST_FILE
+from modules.reference_registry import get_reference_registry
 
 
 class KeywordsEditorDialog(QDialog):
@@ -57,8 +58,7 @@ class KeywordsEditorDialog(QDialog):
     def load_keywords(self):
         try:
             if os.path.exists(self.json_file):
-                with open(self.json_file, 'r') as f:
-                    keywords_dict = json.load(f)
+                keywords_dict = get_reference_registry(self.json_file).get().data
             else:
                 keywords_dict = {"errors": ["error", "warning", "fatal"],
                                "success": ["completed", "successful"]}
@@ -98,6 +98,7 @@ class KeywordsEditorDialog(QDialog):
 
             with open(self.json_file, 'w') as f:
                 json.dump(keywords_dict, f, indent=4)
+            get_reference_registry(self.json_file).invalidate()
 
             QMessageBox.information(self, "Success", "Keywords saved successfully!")
             self.accept()
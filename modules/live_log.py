@@ -0,0 +1,57 @@
+import hashlib
+
+from collections import OrderedDict
+
+class LiveLogModel:
+    """
+    Bookkeeping for the live output pane.
+
+    Drops entries identical to one of the last dedup_window entries, using hashes
+    rather than a search of the whole log, and queues accepted entries so the view
+    can append them in batches. max_blocks is the number of blocks the view keeps
+    before the oldest are evicted; older queued entries are dropped the same way.
+
+    The view flushes the queue every flush_interval milliseconds, or as soon as
+    batch_size entries are queued, and takes at most batch_size entries per flush.
+    """
+    def __init__(self, max_blocks=5000, dedup_window=1000, flush_interval=50, batch_size=100):
+        self.max_blocks = max_blocks
+        self.dedup_window = dedup_window
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._recent_hashes = OrderedDict()
+        self._pending = []
+
+    def add(self, text):
+        """Queues text for display. Returns False if it duplicates a recent entry."""
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        if key in self._recent_hashes:
+            self._recent_hashes.move_to_end(key)
+            return False
+        self._recent_hashes[key] = None
+        if len(self._recent_hashes) > self.dedup_window:
+            self._recent_hashes.popitem(last=False)
+        self._pending.append(text)
+        if len(self._pending) > self.max_blocks:
+            # Would be evicted from the view straight away
+            del self._pending[:-self.max_blocks]
+        return True
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def batch_ready(self):
+        """Returns True once a full batch is queued and should be flushed without waiting."""
+        return len(self._pending) >= self.batch_size
+
+    def take_pending(self, limit=None):
+        """Returns up to limit of the oldest queued entries, all of them without a limit, and removes them from the queue."""
+        if limit is None or limit >= len(self._pending):
+            pending, self._pending = self._pending, []
+        else:
+            pending, self._pending = self._pending[:limit], self._pending[limit:]
+        return pending
+
+    def clear(self):
+        self._recent_hashes.clear()
+        self._pending = []
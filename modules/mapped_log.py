@@ -0,0 +1,119 @@
+import mmap
+import os
+import re
+
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+
+# A line start offset is kept for every LINE_INDEX_STEP lines, so the index stays small
+LINE_INDEX_STEP = 64
+
+class MappedLog:
+    """
+    Read-only, memory-mapped view of a log file with a sparse line-offset index.
+
+    The index is built incrementally with index_more(), typically from a background
+    thread, and lines can be read as soon as the part of the file they are in is indexed.
+    Nothing but the requested lines is ever decoded.
+
+    While indexing, the byte offsets of "Scan-Tool Mode" headings and of ECU header
+    lines (for the names in ecu_names) are collected in sections, as
+    (byte offset, "mode" or "ecu", label) tuples in file order.
+    """
+    def __init__(self, file_path, chunk_size=8 << 20, ecu_names=()):
+        self.file_path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.sections = []
+        self._section_pattern = _section_pattern(ecu_names)
+        self._file = open(self.file_path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses empty files
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self._checkpoints = array('Q', [0])
+        self._scanned = 0
+        self._newlines = 0
+        self.index_complete = self.size == 0
+
+    @property
+    def line_count(self):
+        """Number of lines that can be read so far."""
+        if self.index_complete and self.size and self._map[self.size - 1:self.size] != b'\n':
+            return self._newlines + 1
+        return self._newlines
+
+    def index_more(self):
+        """Indexes the next chunk of the file. Returns False once the whole file is indexed."""
+        if self.index_complete:
+            return False
+        start = self._scanned
+        end = min(start + self.chunk_size, self.size)
+        if end < self.size:
+            # End the chunk on a line boundary so no heading is cut in two
+            newline = self._map.rfind(b'\n', start, end)
+            if newline == -1:
+                newline = self._map.find(b'\n', end)
+            end = self.size if newline == -1 else newline + 1
+        chunk = self._map[start:end]
+        parts = chunk.split(b'\n')
+
+        # Offsets of the lines that begin after each newline in this chunk
+        line_starts = list(accumulate((len(part) + 1 for part in parts[:-1]), initial=start))[1:]
+        first = (-(self._newlines + 1)) % LINE_INDEX_STEP
+        self._checkpoints.extend(line_starts[first::LINE_INDEX_STEP])
+
+        new_sections = []
+        for match in self._section_pattern.finditer(chunk):
+            if match.group('mode') is not None:
+                label = "Mode " + match.group('mode').strip().decode('utf-8', errors='replace')
+                new_sections.append((start + match.start(), "mode", label))
+            else:
+                new_sections.append((start + match.start('ecu'), "ecu", match.group('ecu').strip().decode('utf-8', errors='replace')))
+
+        self._newlines += len(line_starts)
+        self._scanned = end
+        # Published last, so every listed section can already be mapped to its line
+        self.sections.extend(new_sections)
+        self.index_complete = end >= self.size
+        return not self.index_complete
+
+    def lines(self, first_line, count):
+        """Returns up to count lines starting at first_line (0-based) as strings."""
+        count = min(count, self.line_count - first_line)
+        if count <= 0 or first_line < 0:
+            return []
+        position = self._checkpoints[first_line // LINE_INDEX_STEP]
+        for _ in range(first_line % LINE_INDEX_STEP):
+            position = self._map.find(b'\n', position) + 1
+
+        result = []
+        for _ in range(count):
+            line_end = self._map.find(b'\n', position)
+            if line_end == -1:
+                line_end = self.size
+            result.append(self._map[position:line_end].rstrip(b'\r').decode('utf-8', errors='replace'))
+            position = line_end + 1
+        return result
+
+    def line_at_offset(self, byte_offset):
+        """Returns the 0-based line containing byte_offset, or None if it is not indexed yet."""
+        if byte_offset < 0 or byte_offset > self._scanned:
+            return None
+        checkpoint = bisect_right(self._checkpoints, byte_offset) - 1
+        start = self._checkpoints[checkpoint]
+        return checkpoint * LINE_INDEX_STEP + self._map[start:byte_offset].count(b'\n')
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+def _section_pattern(ecu_names):
+    # Mirrors parse_scan_log: a mode name runs up to the first "-" after the heading, and an
+    # ECU header is a line whose second word is a known ECU name
+    pattern = rb'Scan-Tool Mode(?P<mode>[^\n-]*)'
+    if ecu_names:
+        names = b'|'.join(re.escape(name.encode('utf-8')) for name in sorted(ecu_names, key=len, reverse=True))
+        pattern += rb'|^(?P<ecu>[ \t]*\S+[ \t]+(?:' + names + rb')(?=\s|$)[^\n]*)'
+    return re.compile(pattern, re.MULTILINE)
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+
+from collections import deque
+
+class _NoTiming:
+    """Returned by PerformanceStats.stage() while timing is off, so a disabled hook costs one call."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NO_TIMING = _NoTiming()
+
+class _StageTiming:
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class PerformanceStats:
+    """
+    Rolling timings per processing stage, plus file and byte throughput.
+
+    Wrap a stage in "with performance_stats.stage(name):". Only the last `window`
+    samples of each stage are kept for the percentiles; counts and totals cover
+    everything since the last reset. Nothing is recorded while enabled is False.
+    Stages that run in folder check worker processes are not collected.
+    """
+    def __init__(self, window=1000):
+        self.enabled = False
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+            self._totals = {}
+            # (completion time, size) of the most recent files, for the throughput
+            self._recent_files = deque(maxlen=self.window)
+            self._files = 0
+            self._bytes = 0
+
+    def stage(self, name):
+        """Returns a context manager that times the enclosed block as stage name."""
+        if not self.enabled:
+            return NO_TIMING
+        return _StageTiming(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+                self._totals[name] = 0.0
+            samples.append(seconds)
+            self._counts[name] += 1
+            self._totals[name] += seconds
+
+    def add_file(self, size):
+        """Counts one processed file of size bytes towards the throughput."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._recent_files.append((time.monotonic(), size))
+            self._files += 1
+            self._bytes += size
+
+    def summary(self):
+        """Returns the current statistics as a JSON-serialisable dict, times in milliseconds."""
+        with self._lock:
+            stages = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                stages[name] = {
+                    "count": self._counts[name],
+                    "p50_ms": _percentile(ordered, 0.50) * 1000,
+                    "p95_ms": _percentile(ordered, 0.95) * 1000,
+                    "max_ms": ordered[-1] * 1000,
+                    "total_s": self._totals[name],
+                }
+
+            files_per_sec = bytes_per_sec = 0.0
+            if len(self._recent_files) > 1:
+                span = self._recent_files[-1][0] - self._recent_files[0][0]
+                if span > 0:
+                    # The first file only marks the start of the span
+                    files_per_sec = (len(self._recent_files) - 1) / span
+                    bytes_per_sec = sum(size for _, size in list(self._recent_files)[1:]) / span
+
+            return {
+                "stages": stages,
+                "files": self._files,
+                "bytes": self._bytes,
+                "files_per_sec": files_per_sec,
+                "bytes_per_sec": bytes_per_sec,
+            }
+
+    def dump(self, file_path):
+        """Writes the summary to file_path as JSON."""
+        summary = self.summary()
+        summary["time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        with open(file_path, 'w', encoding='utf-8') as dump_file:
+            json.dump(summary, dump_file, indent=2)
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+# Shared by the monitoring and folder check code and the Performance dialog
+performance_stats = PerformanceStats()
@@ -0,0 +1,100 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QDialog,
+                            QVBoxLayout,
+                            QHBoxLayout,
+                            QTableWidget,
+                            QTableWidgetItem,
+                            QPushButton,
+                            QCheckBox,
+                            QLabel,
+                            QMessageBox)
+
+from datetime import datetime
+from pathlib import Path
+from modules.performance import performance_stats
+
+STAGE_COLUMNS = ["Stage", "Count", "p50 (ms)", "p95 (ms)", "Max (ms)", "Total (s)"]
+
+class PerformanceDialog(QDialog):
+    """Shows the per-stage timings collected by performance_stats, refreshed every second."""
+    def __init__(self, settings, log_directory, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.log_directory = Path(log_directory)
+        self.setup_ui()
+        self.refresh()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    def setup_ui(self):
+        self.setWindowTitle("Performance")
+        self.setMinimumSize(650, 400)
+
+        layout = QVBoxLayout(self)
+
+        self.enabled_checkbox = QCheckBox("Collect timings")
+        self.enabled_checkbox.setChecked(performance_stats.enabled)
+        self.enabled_checkbox.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enabled_checkbox)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(STAGE_COLUMNS))
+        self.table.setHorizontalHeaderLabels(STAGE_COLUMNS)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.throughput_label = QLabel()
+        layout.addWidget(self.throughput_label)
+
+        button_layout = QHBoxLayout()
+        self.reset_button = QPushButton("Reset")
+        self.save_button = QPushButton("Save as JSON")
+        self.close_button = QPushButton("Close")
+        button_layout.addWidget(self.reset_button)
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        self.reset_button.clicked.connect(self.reset)
+        self.save_button.clicked.connect(self.save_json)
+        self.close_button.clicked.connect(self.close)
+
+    def set_enabled(self, enabled):
+        performance_stats.enabled = enabled
+        self.settings.setValue("performance_stats", enabled)
+
+    def refresh(self):
+        summary = performance_stats.summary()
+        stages = sorted(summary["stages"].items())
+        self.table.setRowCount(len(stages))
+        for row, (name, stage) in enumerate(stages):
+            values = [name, str(stage["count"]), f"{stage['p50_ms']:.2f}", f"{stage['p95_ms']:.2f}",
+                      f"{stage['max_ms']:.2f}", f"{stage['total_s']:.2f}"]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        self.throughput_label.setText(
+            f"Files: {summary['files']}    {summary['files_per_sec']:.1f} files/s    "
+            f"{summary['bytes_per_sec'] / (1024 * 1024):.2f} MB/s"
+        )
+
+    def reset(self):
+        performance_stats.reset()
+        self.refresh()
+
+    def save_json(self):
+        file_path = self.log_directory / f"performance_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        try:
+            self.log_directory.mkdir(parents=True, exist_ok=True)
+            performance_stats.dump(file_path)
+            QMessageBox.information(self, "Performance", f"Timings saved to:\n{file_path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save timings:\n{str(e)}")
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        super().closeEvent(event)
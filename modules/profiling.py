@@ -0,0 +1,109 @@
+import cProfile
+import pstats
+import threading
+import tracemalloc
+
+from contextlib import nullcontext
+from datetime import datetime
+from constants import CRASH_LOG_DIRECTORY
+
+# Number of allocation sites listed in a memory snapshot
+TOP_ALLOCATIONS = 50
+
+_request_lock = threading.Lock()
+_request = None
+# cProfile and tracemalloc are process-wide; only one capture runs at a time
+_capture_lock = threading.Lock()
+
+def request_profile(cpu=True, memory=False):
+    """Arms a capture of the next monitored file or folder check."""
+    global _request
+    with _request_lock:
+        _request = (cpu, memory)
+
+def take_profile_request():
+    """Returns the pending (cpu, memory) request and clears it, or None if nothing is armed."""
+    global _request
+    with _request_lock:
+        request, _request = _request, None
+        return request
+
+def profile_capture(name, request):
+    """Returns a ProfileCapture for a (cpu, memory) request, or a no-op context when request is None."""
+    if request is None:
+        return nullcontext()
+    cpu, memory = request
+    return ProfileCapture(name, cpu, memory)
+
+class ProfileCapture:
+    """
+    Wraps a block in cProfile and/or tracemalloc and writes the results to CrashLogs,
+    next to the crash reports: <name>_<time>.prof for the CPU profile (open with pstats
+    or snakeviz) and <name>_<time>_memory.txt with the top allocation sites.
+
+    cProfile only sees the thread that enters the block, and folder check worker processes are not profiled.
+    """
+    def __init__(self, name, cpu=True, memory=False):
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.paths = []
+        self._profiler = None
+        self._started_tracemalloc = False
+        self._active = False
+
+    def __enter__(self):
+        if not _capture_lock.acquire(blocking=False):
+            print(f"Profiling of {self.name} skipped: another capture is running.")
+            return self
+        self._active = True
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.cpu:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._active:
+            return False
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+            self._write_results()
+        except Exception as e:
+            print(f"Failed to write the profile of {self.name}: {e}")
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            _capture_lock.release()
+        return False
+
+    def _write_results(self):
+        CRASH_LOG_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        base_name = f"{self.name}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+
+        if self._profiler is not None:
+            profile_path = CRASH_LOG_DIRECTORY / f"{base_name}.prof"
+            self._profiler.dump_stats(profile_path)
+            self.paths.append(profile_path)
+            # A readable summary, for when pstats is not at hand
+            summary_path = CRASH_LOG_DIRECTORY / f"{base_name}_cpu.txt"
+            with open(summary_path, 'w', encoding='utf-8') as summary_file:
+                pstats.Stats(self._profiler, stream=summary_file).sort_stats("cumulative").print_stats(40)
+            self.paths.append(summary_path)
+
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            memory_path = CRASH_LOG_DIRECTORY / f"{base_name}_memory.txt"
+            with open(memory_path, 'w', encoding='utf-8') as memory_file:
+                memory_file.write(f"Traced memory: current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB\n")
+                memory_file.write(f"Top {TOP_ALLOCATIONS} allocation sites:\n")
+                for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    memory_file.write(f"{statistic}\n")
+            self.paths.append(memory_path)
+
+        for path in self.paths:
+            print(f"Profile written to: {path}")
@@ -1,24 +1,39 @@
+import queue
+import threading
 import time
-import os
-import winsound
 
-from pathlib import Path
-from modules.file_processing import read_file_contents, find_new_txt_files
-from modules.ecu_processing import load_ecu_reference, count_ecus_in_modes, load_keywords_from_json, find_fail_keywords, find_recent_fueled_ignition_data
+from collections import deque
+
+try:
+    import winsound
+except ImportError:
+    # Not available outside Windows, e.g. when running headless checks on a server
+    winsound = None
 
+from pathlib import Path
+from constants import LOG_SUBFOLDER
+from modules.directory_watcher import create_directory_watcher
+from modules.file_processing import read_file_contents, find_new_txt_files, file_content_hash, file_signature, ProcessedFiles, SettlingFiles, JOURNAL_FILE_NAME
+from modules.ecu_processing import ParseCancelled, parse_scan_log
+from modules.equivalence import shadow_check, SHADOW_LOG_FILE_NAME
+from modules.performance import performance_stats
+from modules.profiling import profile_capture, take_profile_request
+from modules.reference_registry import get_reference_registry
 
-json_file_path = os.path.abspath('reference_list.json')
-#csv_file_path = r'fail_keywords.csv'
-keywords, ignore_keywords = load_keywords_from_json(json_file_path)
-#flattened_reference = load_ecu_reference(json_file_path)
+# Live monitoring analyses files in this many threads, so detecting new files never waits for a parse
+LIVE_WORKERS = 2
+# Files handed to the workers but not started yet; further settled files wait in the detector's backlog
+LIVE_QUEUE_SIZE = 2 * LIVE_WORKERS
+# How often the detector offers its backlog to the workers, instead of the usual half second
+BACKLOG_POLL_INTERVAL = 0.05
 
 def beep_sound(duration=1000, frequency=440):
     """Plays a beep sound with the given duration and frequency."""
-    winsound.Beep(duration, frequency)
+    if winsound is not None:
+        winsound.Beep(duration, frequency)
 
-def handle_failures(file_content):
+def handle_failures(fail_details):
     """Handles and reports failures detected in the log content."""
-    fail_details = find_fail_keywords(file_content, keywords, ignore_keywords)
     if fail_details:
         return f"<span style='color:red;'>Fail details found: {fail_details}</span><br>"
     return ""
@@ -121,52 +136,213 @@ def compare_status_with_logfile(logfile_name, detailed_faults):
         output += f"<span style='color:red;'>Status mismatch! Logfile: {logfile_status.capitalize()}, Determined: {determined_status.capitalize()}</span><br>"
     return output
         
-def process_file(file, json_file_path):
-    """Processes a single log file for ECU data, faults, and warnings, and returns the output as a string."""
+def process_file(file, json_file_path, shadow_log=None, is_running=None):
+    """
+    Processes a single log file for ECU data, faults, and warnings, and returns the output as a string.
+    With shadow_log, the original parser functions are run as well and divergences are logged there.
+    Raises ParseCancelled if is_running() returns False while the log is parsed.
+    """
     outputs = []
-    file_content = read_file_contents(file)
+    with performance_stats.stage("Live: read"):
+        file_content = read_file_contents(file)
     if file_content is None:
         return ""
+    if performance_stats.enabled:
+        performance_stats.add_file(file.stat().st_size)
     
-    # Load reference data for ECU identifiers from the JSON file.
-    flattened_reference = load_ecu_reference(json_file_path)
-    ecu_counts, detailed_faults, warning = count_ecus_in_modes(file_content, flattened_reference)
+    # Compiled rules for ECU identifiers and keywords, shared and only rebuilt when the JSON changes.
+    rules = get_reference_registry(json_file_path).get()
+
+    # Parse the log once; every report below reads from the resulting ScanLog.
+    with performance_stats.stage("Live: parse"):
+        scan_log = parse_scan_log(file_content, rules, is_running=is_running)
+    if shadow_log is not None:
+        with performance_stats.stage("Live: shadow check"):
+            shadow_check(file.name, file_content, rules, scan_log, shadow_log)
+    ecu_counts, detailed_faults, warning = scan_log.ecu_counts, scan_log.mode_faults, scan_log.warning
     
-    # Reporting the processing of the new file
-    outputs.append(f"<b>Processing new file:</b> {file.name}<br>")
+    with performance_stats.stage("Live: format HTML"):
+        # Reporting the processing of the new file
+        outputs.append(f"<b>Processing new file:</b> {file.name}<br>")
     
-    # Identifying and reporting on failures or lack of response in the log data.
-    fail_output = handle_failures(file_content)
-    if fail_output:
-        outputs.append(fail_output)
+        # Identifying and reporting on failures or lack of response in the log data.
+        fail_output = handle_failures(scan_log.fail_details)
+        if fail_output:
+            outputs.append(fail_output)
     
-    # Displaying detailed fault information for specific modes.
-    fault_output = display_faults(detailed_faults)
-    if fault_output:
-        outputs.append(fault_output)
+        # Displaying detailed fault information for specific modes.
+        fault_output = display_faults(detailed_faults)
+        if fault_output:
+            outputs.append(fault_output)
     
-    # Displaying ECU counts per mode
-    ecu_output = display_ecu_counts(ecu_counts)
-    if ecu_output:
-        outputs.append(ecu_output)
+        # Displaying ECU counts per mode
+        ecu_output = display_ecu_counts(ecu_counts)
+        if ecu_output:
+            outputs.append(ecu_output)
     
-    # Comparing status with logfile
-    status_output = compare_status_with_logfile(file.name, detailed_faults)
-    if status_output:
-        outputs.append(status_output)
+        # Comparing status with logfile
+        status_output = compare_status_with_logfile(file.name, detailed_faults)
+        if status_output:
+            outputs.append(status_output)
     
-    # Displaying warning messages
-    if warning:
-        outputs.append(f"<span style='color:red;'>{warning}</span><br>")
+        # Displaying warning messages
+        if warning:
+            outputs.append(f"<span style='color:red;'>{warning}</span><br>")
     
-    # Retrieving and displaying data for fueled ignition cycles.
-    fueled_ignition_cycle_counter = find_recent_fueled_ignition_data(file_content)
-    if fueled_ignition_cycle_counter:
-        outputs.append(f"<br>Ignition Cycle Counter: {fueled_ignition_cycle_counter}<br>")
+        # Retrieving and displaying data for fueled ignition cycles.
+        fueled_ignition_cycle_counter = scan_log.ignition_cycle_counter
+        if fueled_ignition_cycle_counter:
+            outputs.append(f"<br>Ignition Cycle Counter: {fueled_ignition_cycle_counter}<br>")
     
     return ''.join(outputs)
 
+class LiveAnalysisPool:
+    """
+    The analysis workers of live monitoring, fed by the detector loop in monitor_directory.
+
+    submit() never blocks: it returns False while the bounded queue is full, and the detector
+    keeps the file until a worker is free. Each worker hashes its file, skips it if it was only
+    touched, and passes the process_file output to emit as soon as it is ready, so results
+    arrive in completion order. Finished files are reported as (file, signature, content hash, analysed) on
+    completed, for the detector to mark; processed_files is only read here.
+    """
+    def __init__(self, json_file_path, processed_files, emit, is_running, shadow_log=None,
+                 workers=LIVE_WORKERS, queue_size=LIVE_QUEUE_SIZE):
+        self.json_file_path = json_file_path
+        self.processed_files = processed_files
+        self.emit = emit
+        self.is_running = is_running
+        self.shadow_log = shadow_log
+        self.completed = queue.Queue()
+        self._jobs = queue.Queue(maxsize=max(queue_size, workers))
+        # emit may write to a stream, so outputs are passed on one at a time
+        self._emit_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"LiveAnalysis-{index}", daemon=True)
+                         for index in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, file, modified):
+        """Queues a settled file; modified marks a rewrite of a file analysed before. Returns False if the queue is full."""
+        try:
+            self._jobs.put_nowait((file, modified))
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        """Drops the files not started yet and waits for the workers, which abandon a parse in progress once is_running() is False."""
+        try:
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            file, modified = job
+            # A capture armed from the menu or the command line wraps the next file analysed
+            with profile_capture("monitoring", take_profile_request()):
+                self.completed.put(self._analyze(file, modified))
+
+    def _analyze(self, file, modified):
+        # Taken first, so a rewrite while the file is hashed or parsed shows up as a change on the next scan
+        signature = file_signature(file)
+        with performance_stats.stage("Live: hash"):
+            content_hash = file_content_hash(file)
+        if self.processed_files.has_same_content(file, content_hash):
+            # Only touched, not rewritten
+            return file, signature, content_hash, True
+        try:
+            output = process_file(file, self.json_file_path, self.shadow_log, self.is_running)
+        except ParseCancelled:
+            # Left unmarked, so it is analysed again in the next session
+            return file, signature, content_hash, False
+        except Exception as e:
+            # Marked anyway, so a log the parser cannot handle is not retried on every scan
+            print(f"Error: Failed to process {file.name}: {e}")
+            return file, signature, content_hash, True
+        if modified:
+            output = f"<b>Modified file detected:</b> {file.name}<br>" + output
+        with self._emit_lock:
+            self.emit(output)
+        return file, signature, content_hash, True
+
+def monitor_directory(directory, json_file_path, emit, is_running=lambda: True, watcher_backend="auto", shadow=False,
+                      workers=LIVE_WORKERS):
+    """
+    Live monitoring loop shared by MonitoringThread and the command line.
+    Passes the process_file output of every new or rewritten log to emit until is_running() returns False.
+
+    Files analysed in earlier sessions are read from the journal in the Logs subfolder, new and modified
+    files wait until the scan tool has finished writing them, and files that were only touched are skipped.
+    In shadow mode each file is also checked against the original parser functions.
+
+    This loop only detects files. They are analysed by a LiveAnalysisPool of worker threads and emitted
+    as each one completes, so a burst of files or one very large log does not delay the next scan.
+    emit is called from the worker threads.
+    """
+    # Load the files analysed in earlier sessions to avoid re-processing
+    processed_files = ProcessedFiles(Path(directory) / LOG_SUBFOLDER / JOURNAL_FILE_NAME)
+    processed_files.start_session(directory)
+    shadow_log = Path(directory) / LOG_SUBFOLDER / SHADOW_LOG_FILE_NAME if shadow else None
+
+    # Continuous monitoring loop, woken by the watcher when the directory may have changed.
+    # New and modified files wait in settling_files until the scan tool has finished writing them.
+    watcher = create_directory_watcher(directory, watcher_backend)
+    settling_files = SettlingFiles()
+    pool = LiveAnalysisPool(json_file_path, processed_files, emit, is_running, shadow_log, workers)
+    # Settled files waiting for room in the pool's queue, and every file waiting or being analysed
+    backlog = deque()
+    in_progress = set()
+
+    def mark_completed():
+        try:
+            while True:
+                file, signature, content_hash, analysed = pool.completed.get_nowait()
+                if analysed:
+                    processed_files.mark(file, content_hash, signature)
+                in_progress.discard(file)
+        except queue.Empty:
+            pass
 
+    # Scan straight away to catch up on files that arrived since the last session
+    changed = True
+    try:
+        while is_running():
+            mark_completed()
+            # A directory listing only when the watcher asks for one, otherwise just the files it reported
+            changed_files = watcher.take_changed_files()
+            found = []
+            if changed or changed_files:
+                with performance_stats.stage("Live: detect changes"):
+                    if changed:
+                        found = processed_files.find_changed(directory)
+                        watcher.watch_files(found)
+                    else:
+                        found = processed_files.find_changed_files(changed_files)
+            for file in found:
+                # Files in progress are found again until they are marked
+                if file not in in_progress:
+                    settling_files.add(file)
+            for file in settling_files.pop_settled():
+                in_progress.add(file)
+                backlog.append((file, file.name in processed_files))
+            while backlog and pool.submit(*backlog[0]):
+                backlog.popleft()
+            changed = watcher.wait_for_change(BACKLOG_POLL_INTERVAL if backlog else 0.5)
+    finally:
+        pool.close()
+        mark_completed()
+        watcher.close()
+        processed_files.close()
 
 # Continuously checking for new txt files
 def continuous_file_check(logfile_directory, json_file_path):
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import threading
+import time
+
+from pathlib import Path
+from modules.ecu_processing import keywords_from_data, ecu_reference_from_data, KeywordMatcher, FAULT_MODES
+
+# Bump when the persisted snapshot format changes so old ones are rebuilt
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".rules"
+# Keys of reference_list.json that are not vehicle variants
+NON_VARIANT_KEYS = ("keywords", "ignore_keywords")
+
+class RulesSnapshot:
+    """
+    Everything derived from one version of reference_list.json, compiled once.
+
+    Attributes:
+    - data (dict): The parsed JSON, as read.
+    - content_hash (str): SHA-256 of the JSON file's bytes, identifying this version.
+    - keywords, ignore_keywords (tuple): The keyword lists.
+    - matcher (KeywordMatcher): Lowercase fused matcher for the keyword lists.
+    - flattened_reference (frozenset): ECU names recognised in ECU header lines.
+    - fault_modes (tuple): Modes compared and reported on by the parsers.
+
+    compiled, as read from a persisted snapshot, supplies the keyword lists and ECU names
+    instead of deriving them from data again.
+    Snapshots are shared between threads and worker processes and are never modified.
+    """
+    def __init__(self, data, content_hash=None, compiled=None):
+        if compiled is not None:
+            keywords, ignore_keywords = compiled["keywords"], compiled["ignore_keywords"]
+            flattened_reference = compiled["flattened_reference"]
+        else:
+            try:
+                keywords, ignore_keywords = keywords_from_data(data)
+            except KeyError as e:
+                print(f"Error: {e}")
+                keywords, ignore_keywords = [], []
+
+            try:
+                flattened_reference = ecu_reference_from_data(data)
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+                flattened_reference = set()
+
+        fields = {
+            "data": data,
+            "content_hash": content_hash,
+            "keywords": tuple(keywords),
+            "ignore_keywords": tuple(ignore_keywords),
+            "matcher": KeywordMatcher(keywords, ignore_keywords),
+            "flattened_reference": frozenset(flattened_reference),
+            "fault_modes": tuple(FAULT_MODES),
+        }
+        self.__dict__.update(fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RulesSnapshot is read-only")
+
+def load_rules_snapshot(json_file_path, persist=False):
+    """
+    Returns the RulesSnapshot for the reference list.
+
+    With persist, the compiled keyword lists and ECU names are also stored as JSON next to
+    the reference list (reference_list.rules) and reused for as long as the contents of the
+    reference list hash the same.
+    """
+    json_file_path = Path(json_file_path)
+    try:
+        raw = json_file_path.read_bytes()
+    except FileNotFoundError:
+        print(f"Error: The file '{json_file_path}' was not found.")
+        return RulesSnapshot({})
+    except OSError as e:
+        print(f"Error: Could not read '{json_file_path}': {e}")
+        return RulesSnapshot({})
+
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Error: The file '{json_file_path}' is not a valid JSON file.")
+        data = {}
+
+    content_hash = hashlib.sha256(raw).hexdigest()
+    snapshot_path = json_file_path.with_suffix(SNAPSHOT_SUFFIX)
+    if persist:
+        compiled = _read_persisted_snapshot(snapshot_path, content_hash)
+        if compiled is not None:
+            return RulesSnapshot(data, content_hash, compiled)
+
+    snapshot = RulesSnapshot(data, content_hash)
+    if persist:
+        compiled = {
+            "version": SNAPSHOT_VERSION,
+            "content_hash": content_hash,
+            "keywords": list(snapshot.keywords),
+            "ignore_keywords": list(snapshot.ignore_keywords),
+            "flattened_reference": sorted(snapshot.flattened_reference),
+        }
+        try:
+            snapshot_path.write_text(json.dumps(compiled), encoding='utf-8')
+        except OSError as e:
+            print(f"Could not save the rules snapshot to {snapshot_path}: {e}")
+    return snapshot
+
+def _read_persisted_snapshot(snapshot_path, content_hash):
+    try:
+        compiled = json.loads(snapshot_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        # Missing, truncated or in an older format; rebuilt from the reference list
+        return None
+    if not isinstance(compiled, dict) or compiled.get("version") != SNAPSHOT_VERSION or compiled.get("content_hash") != content_hash:
+        return None
+    return compiled
+
+def _content_hash(file_path):
+    try:
+        return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+class ReferenceRegistry:
+    """
+    Loads reference_list.json once and hands the same RulesSnapshot to every caller.
+
+    The file is read and hashed at most once per check_interval seconds, which for a small
+    JSON file costs about as much as a stat, and only parsed again when its contents changed.
+    Unlike an mtime check this also catches edits within one timestamp tick, e.g. on FAT or SMB.
+    Call invalidate() after writing the file to pick up the change immediately.
+    """
+    def __init__(self, json_file_path, check_interval=1.0, persist=False):
+        self.json_file_path = Path(json_file_path)
+        self.check_interval = check_interval
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._reference = None
+        self._last_check = 0.0
+
+    def get(self):
+        """Returns the current RulesSnapshot, reloading it if the file has changed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._reference is None or now - self._last_check >= self.check_interval:
+                self._last_check = now
+                if self._reference is None or _content_hash(self.json_file_path) != self._reference.content_hash:
+                    self._reference = load_rules_snapshot(self.json_file_path, self.persist)
+            return self._reference
+
+    def invalidate(self):
+        with self._lock:
+            self._reference = None
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_reference_registry(json_file_path):
+    """Returns the registry shared by everyone using this reference list."""
+    key = Path(json_file_path).resolve()
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ReferenceRegistry(key)
+        return registry
@@ -1,37 +1,22 @@
-import time
-
 from PyQt5.QtCore import QThread, pyqtSignal
-from pathlib import Path
-from modules.file_processing import find_new_txt_files
-from modules.real_time_monitoring import process_file
+from modules.real_time_monitoring import monitor_directory
 from modules.check_errors_in_folder import check_errors_in_folder
+from modules.profiling import profile_capture, take_profile_request
 
 class MonitoringThread(QThread):
     output_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
 
-    def __init__(self, directory, json_file_path):
+    def __init__(self, directory, json_file_path, shadow=False):
         super().__init__()
         self.directory = directory
         self.json_file_path = json_file_path
+        self.shadow = shadow
         self._is_running = True
 
     def run(self):
-        processed_files = set()
-
-        # Populate initial set of processed files to avoid re-processing
-        directory = Path(self.directory)
-        for file in directory.glob('*.txt'):
-            processed_files.add(file.name)
-
-        # Continuous monitoring loop
-        while self._is_running:
-            new_files = find_new_txt_files(self.directory, processed_files)
-            for file in new_files:
-                output = process_file(file, self.json_file_path)
-                self.output_signal.emit(output)
-                processed_files.add(file.name)
-            time.sleep(5)
+        monitor_directory(self.directory, self.json_file_path, self.output_signal.emit, is_running=lambda: self._is_running,
+                          shadow=self.shadow)
         self.finished_signal.emit()
 
     def stop(self):
@@ -39,20 +24,50 @@ class MonitoringThread(QThread):
 
 class FullFolderCheckThread(QThread):
     output_signal = pyqtSignal(str)
+    rows_signal = pyqtSignal(list)
+    # Files and bytes done, throughput and ETA, at most four times a second (see FolderProgress)
+    progress_signal = pyqtSignal(dict)
     finished_signal = pyqtSignal()
 
-    def __init__(self, directory, json_file_path):
+    def __init__(self, directory, json_file_path, workers=1, results_table=False, shadow=False):
         super().__init__()
         self.directory = directory
         self.json_file_path = json_file_path
+        self.workers = workers
+        self.results_table = results_table
+        self.shadow = shadow
         self._is_running = True
 
     def run(self):
         if self._is_running:
-            # Pass the is_running function to check_errors_in_folder
-            output = check_errors_in_folder(self.directory, self.json_file_path, is_running=lambda: self._is_running)
-            self.output_signal.emit(output)
+            # A capture armed from the menu or the command line wraps the whole check
+            with profile_capture("folder_check", take_profile_request()):
+                # Pass the is_running function to check_errors_in_folder; the report is streamed in batches
+                # With results_table, the per-file findings go out as table rows instead of HTML
+                check_errors_in_folder(self.directory, self.json_file_path, is_running=lambda: self._is_running,
+                                       workers=self.workers, emit=self.output_signal.emit,
+                                       emit_rows=self.rows_signal.emit if self.results_table else None, shadow=self.shadow,
+                                       progress=self.progress_signal.emit)
         self.finished_signal.emit()
 
     def stop(self):
-        self._is_running = False
\ No newline at end of file
+        self._is_running = False
+
+class LineIndexThread(QThread):
+    progress_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal()
+
+    def __init__(self, mapped_log):
+        super().__init__()
+        self.mapped_log = mapped_log
+        self._is_running = True
+
+    def run(self):
+        # Index chunk by chunk so the viewer can show lines as soon as they are indexed
+        while self._is_running and self.mapped_log.index_more():
+            self.progress_signal.emit(self.mapped_log.line_count)
+        self.progress_signal.emit(self.mapped_log.line_count)
+        self.finished_signal.emit()
+
+    def stop(self):
+        self._is_running = False
@@ -76,9 +76,34 @@ class Ui_Logfilter(object):
         self.label_results.setObjectName("label_results")
         self.gridLayout.addWidget(self.label_results, 6, 0, 1, 2)
 
-        self.textBrowser_log = QtWidgets.QTextBrowser(self.centralwidget)
+        # The log shares its cell with the folder check results table, which is hidden until used
+        self.splitter_results = QtWidgets.QSplitter(QtCore.Qt.Vertical, self.centralwidget)
+        self.splitter_results.setObjectName("splitter_results")
+        self.gridLayout.addWidget(self.splitter_results, 7, 0, 1, 2)
+
+        self.textBrowser_log = QtWidgets.QTextBrowser(self.splitter_results)
         self.textBrowser_log.setObjectName("textBrowser_log")
-        self.gridLayout.addWidget(self.textBrowser_log, 7, 0, 1, 2)
+
+        self.widget_results = QtWidgets.QWidget(self.splitter_results)
+        self.widget_results.setObjectName("widget_results")
+        self.verticalLayout_results = QtWidgets.QVBoxLayout(self.widget_results)
+        self.verticalLayout_results.setContentsMargins(0, 0, 0, 0)
+
+        self.lineEdit_results_filter = QtWidgets.QLineEdit(self.widget_results)
+        self.lineEdit_results_filter.setObjectName("lineEdit_results_filter")
+        self.verticalLayout_results.addWidget(self.lineEdit_results_filter)
+
+        self.tableView_results = QtWidgets.QTableView(self.widget_results)
+        self.tableView_results.setObjectName("tableView_results")
+        self.tableView_results.setSortingEnabled(True)
+        self.tableView_results.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        # Fixed row heights so large result sets scroll without measuring every row
+        self.tableView_results.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.tableView_results.verticalHeader().setVisible(False)
+        self.tableView_results.horizontalHeader().setStretchLastSection(True)
+        self.verticalLayout_results.addWidget(self.tableView_results)
+
+        self.widget_results.hide()
 
     def _setup_mode_selection(self):
         # Fonts
@@ -161,6 +186,20 @@ class Ui_Logfilter(object):
         self.actionEdit_Keywords = QtWidgets.QAction(Logfilter)
         self.actionEdit_Keywords.setObjectName("actionEdit_Keywords")
 
+        self.actionFolder_Check_Workers = QtWidgets.QAction(Logfilter)
+        self.actionFolder_Check_Workers.setObjectName("actionFolder_Check_Workers")
+
+        self.actionResults_Table = QtWidgets.QAction(Logfilter)
+        self.actionResults_Table.setCheckable(True)
+        self.actionResults_Table.setObjectName("actionResults_Table")
+        self.actionShadow_Mode = QtWidgets.QAction(Logfilter)
+        self.actionShadow_Mode.setCheckable(True)
+        self.actionShadow_Mode.setObjectName("actionShadow_Mode")
+        self.actionPerformance = QtWidgets.QAction(Logfilter)
+        self.actionPerformance.setObjectName("actionPerformance")
+        self.actionProfile_Next_Run = QtWidgets.QAction(Logfilter)
+        self.actionProfile_Next_Run.setObjectName("actionProfile_Next_Run")
+
         self.actionAbout = QtWidgets.QAction(Logfilter)
         self.actionAbout.setObjectName("actionAbout")
 
@@ -173,6 +212,11 @@ class Ui_Logfilter(object):
 
         self.menuSettings.addAction(self.actionSharepoint_Check_N_A)
         self.menuSettings.addAction(self.actionEdit_Keywords)
+        self.menuSettings.addAction(self.actionFolder_Check_Workers)
+        self.menuSettings.addAction(self.actionResults_Table)
+        self.menuSettings.addAction(self.actionShadow_Mode)
+        self.menuSettings.addAction(self.actionPerformance)
+        self.menuSettings.addAction(self.actionProfile_Next_Run)
         self.menuHelp.addAction(self.actionAbout)
 
         self.menubar.addAction(self.menuFile.menuAction())
@@ -209,6 +253,12 @@ class Ui_Logfilter(object):
         self.actionExit.setText(_translate("Logfilter", "Exit"))
         self.actionSharepoint_Check_N_A.setText(_translate("Logfilter", "Sharepoint Check (N/A)"))
         self.actionEdit_Keywords.setText(_translate("Logfilter", "Edit Keywords"))
+        self.actionFolder_Check_Workers.setText(_translate("Logfilter", "Folder Check Workers"))
+        self.actionResults_Table.setText(_translate("Logfilter", "Folder Check Results as Table"))
+        self.actionShadow_Mode.setText(_translate("Logfilter", "Shadow Parser Check"))
+        self.actionPerformance.setText(_translate("Logfilter", "Performance..."))
+        self.actionProfile_Next_Run.setText(_translate("Logfilter", "Profile Next Run..."))
+        self.lineEdit_results_filter.setPlaceholderText(_translate("Logfilter", "Filter results..."))
         self.actionAbout.setText(_translate("Logfilter", "About"))
 
 